@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+import time
+
+import click
+
+from unicode import app
+
+
+@click.command()
+@click.option("-d", "--cache-dir", required=True, type=click.Path(exists=True))
+@click.option("-f", "--first", default="4E00", help="first codepoint (hex)")
+@click.option("-n", "--count", default=2000, type=int)
+@click.option("-b", "--batch", default=500, type=int)
+def main(cache_dir: str, first: str, count: int, batch: int) -> None:
+    app.unicode_info.load(cache_dir)
+    client = app.flask_app.test_client()
+    codes = [int(first, 16) + i for i in range(count)]
+
+    # distinct codepoints, so that the html pages are not served from the render cache
+    start_time = time.time()
+    for code in codes:
+        client.get(f"/c/{code:04X}")
+    html_time = time.time() - start_time
+
+    start_time = time.time()
+    for i in range(0, count, batch):
+        client.get(f"/api/codepoints?codes={codes[i]:04X}-{codes[min(i + batch, count) - 1]:04X}")
+    api_time = time.time() - start_time
+
+    start_time = time.time()
+    for i in range(0, count, batch):
+        client.get(f"/api/codepoints?codes={codes[i]:04X}-{codes[min(i + batch, count) - 1]:04X}&fields=name")
+    name_time = time.time() - start_time
+
+    click.echo(f"html:              {count / html_time:10.0f} codepoints/s")
+    click.echo(f"api (batch {batch}):   {count / api_time:10.0f} codepoints/s")
+    click.echo(f"api (names only):  {count / name_time:10.0f} codepoints/s")
+
+
+if __name__ == "__main__":
+    main()
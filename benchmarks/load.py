@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+import os
+import pickle
+import time
+import typing
+
+import click
+
+from unicode import parsers
+from unicode.download import (
+    BLOCKS_TARGET,
+    CASEFOLDING_TARGET,
+    CONFUSABLES_TARGET,
+    HANGUL_TARGET,
+    NAMESLIST_TARGET,
+    UNIHAN_TARGET,
+    WIKIPEDIA_TARGET,
+)
+from unicode.uinfo import UInfo
+
+
+def parse_phases(cache_dir: str) -> typing.List[typing.Tuple[str, typing.Callable[[], typing.Any]]]:
+    # the parsers that UInfo.load submits to the process pool
+    block_ends = {
+        range_from: range_to for range_from, range_to, _ in parsers.parse_blocks(os.path.join(cache_dir, BLOCKS_TARGET))
+    }
+    return [
+        (NAMESLIST_TARGET, lambda: parsers.parse_nameslist(os.path.join(cache_dir, NAMESLIST_TARGET), block_ends)),
+        (CONFUSABLES_TARGET, lambda: parsers.parse_confusables(os.path.join(cache_dir, CONFUSABLES_TARGET))),
+        (CASEFOLDING_TARGET, lambda: parsers.parse_casefolding(os.path.join(cache_dir, CASEFOLDING_TARGET))),
+        (UNIHAN_TARGET, lambda: parsers.parse_unihan(os.path.join(cache_dir, UNIHAN_TARGET))),
+        (HANGUL_TARGET, lambda: parsers.parse_hangul(os.path.join(cache_dir, HANGUL_TARGET))),
+        (WIKIPEDIA_TARGET, lambda: parsers.parse_wikipedia(os.path.join(cache_dir, WIKIPEDIA_TARGET))),
+    ]
+
+
+def report_phases(cache_dir: str, sequential_time: float, repeat: int) -> None:
+    # Without enough cores the pool cannot be measured directly, so the parse phases are timed one by one:
+    # in a parallel load the parent still merges all records and unpickles them, which stays sequential.
+    parse_times = []
+    unpickle_time = 0.0
+    for name, parse in parse_phases(cache_dir):
+        times = []
+        for _ in range(repeat):
+            start_time = time.time()
+            records = parse()
+            times.append(time.time() - start_time)
+        data = pickle.dumps(records)
+        start_time = time.time()
+        pickle.loads(data)
+        unpickle_time += time.time() - start_time
+        parse_times.append(min(times))
+        click.echo(f"  parse {name}: {min(times):.2f}s, {len(data) / 2**20:.1f} MiB of records")
+    sequential_rest = sequential_time - sum(parse_times)
+    critical_path = max(parse_times) + sequential_rest + unpickle_time
+    click.echo(f"  parsing: {sum(parse_times):.2f}s, merging and indexing: {sequential_rest:.2f}s")
+    click.echo(f"  unpickling the records in the parent: {unpickle_time:.2f}s")
+    click.echo(
+        f"  best case with enough cores (no pool startup): {critical_path:.2f}s,"
+        f" at most {sequential_time / critical_path:.2f}x"
+    )
+
+
+@click.command()
+@click.option("-d", "--cache-dir", required=True, type=click.Path(exists=True))
+@click.option("-w", "--workers", default=os.cpu_count() or 1, type=int)
+@click.option("-n", "--repeat", default=3, type=int)
+def main(cache_dir: str, workers: int, repeat: int) -> None:
+    click.echo(f"{len(os.sched_getaffinity(0))} usable cores")
+    results = {}
+    for mode_workers in [0, workers]:
+        times = []
+        for _ in range(repeat):
+            start_time = time.time()
+            UInfo().load(cache_dir, mode_workers)
+            times.append(time.time() - start_time)
+        results[mode_workers] = min(times)
+        click.echo(f"workers={mode_workers}: {results[mode_workers]:.2f}s (best of {repeat})")
+    click.echo(f"speedup: {results[0] / results[workers]:.2f}x")
+    report_phases(cache_dir, results[0], repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+
+import gc
+import os
+import re
+import resource
+import time
+import tracemalloc
+import typing
+
+import click
+
+from unicode import parsers
+from unicode.block import Block, Subblock
+from unicode.codepoint import code_link
+from unicode.download import (
+    BLOCKS_TARGET,
+    CASEFOLDING_TARGET,
+    CONFUSABLES_TARGET,
+    HANGUL_TARGET,
+    NAMESLIST_TARGET,
+    UNIHAN_TARGET,
+)
+from unicode.uinfo import UInfo
+
+# the codepoint data before the columnar store (an object per codepoint of every block), for comparison; it
+# is built from the same parser records as UInfo.load
+
+
+class LegacyCodepointInfo:  # pylint: disable=too-few-public-methods
+    def __init__(self, codepoint: int, name: str):
+        self.codepoint = codepoint
+        self.name = name
+
+
+class LegacyCodepoint:  # pylint: disable=too-many-instance-attributes,too-few-public-methods
+    def __init__(self, codepoint: int, name: str, block_id: typing.Optional[int] = None):
+        self.info = LegacyCodepointInfo(codepoint, name)
+        self.block: typing.Optional[int] = block_id
+        self.subblock: typing.Optional[int] = None
+        self.case: typing.Optional[int] = None
+        self.alternate: typing.List[str] = []
+        self.comments: typing.List[str] = []
+        self.related: typing.List[int] = []
+        self.confusables: typing.List[int] = []
+        self.combinables: typing.List[typing.List[int]] = []
+        self.prev: typing.Optional[int] = None
+        self.next: typing.Optional[int] = None
+
+
+class LegacyData(typing.NamedTuple):
+    blocks: typing.Dict[int, Block]
+    subblocks: typing.Dict[int, Subblock]
+    codepoints: typing.List[typing.Optional[LegacyCodepoint]]
+
+
+def legacy_load(cache_dir: str) -> LegacyData:  # pylint: disable=too-many-locals,too-many-branches
+    blocks = {
+        range_from: Block(range_from, range_to, name)
+        for range_from, range_to, name in parsers.parse_blocks(os.path.join(cache_dir, BLOCKS_TARGET))
+    }
+    nameslist = parsers.parse_nameslist(
+        os.path.join(cache_dir, NAMESLIST_TARGET),
+        {block_id: block.to_codepoint() for block_id, block in blocks.items()},
+    )
+    for range_from, range_to, name in nameslist.blocks:
+        blocks[range_from] = Block(range_from, range_to, name)
+    codepoints: typing.List[typing.Optional[LegacyCodepoint]] = [None] * (0x10FFFF + 1)
+    for block_id, block in blocks.items():
+        for code in block.codepoints_iter():
+            codepoints[code] = LegacyCodepoint(code, "<unassigned>", block_id)
+
+    def get(code: int) -> LegacyCodepoint:
+        codepoint = codepoints[code]
+        assert codepoint is not None
+        return codepoint
+
+    for code, name in nameslist.names:
+        get(code).info.name = name
+    for code, alternate in nameslist.alternates:
+        get(code).alternate.append(alternate)
+    for code, comment in nameslist.comments:
+        get(code).comments.append(comment)
+    for code, code2 in nameslist.related:
+        get(code).related.append(code2)
+    subblocks = {}
+    for subblock_from, subblock_to, name in nameslist.subblocks:
+        subblock = subblocks[subblock_from] = Subblock(subblock_from, subblock_to, name)
+        for code in subblock.codepoints_iter():
+            get(code).subblock = subblock_from
+    # the comments stored the links to the (existing) codes they mention
+    re_hex = re.compile(r"\b[0-9A-F]{4,6}\b")
+
+    def link(match: typing.Match[str]) -> str:
+        code = int(match.group(0), 16)
+        return code_link(match.group(0).lower()) if code < len(codepoints) and codepoints[code] else match.group(0)
+
+    for codepoint in codepoints:
+        if codepoint is not None and codepoint.comments:
+            codepoint.comments = [re_hex.sub(link, comment) for comment in codepoint.comments]
+
+    confusables = parsers.parse_confusables(os.path.join(cache_dir, CONFUSABLES_TARGET))
+    sets: typing.Dict[int, typing.List[int]] = {}
+    for code1, code2 in confusables.pairs:
+        code1, code2 = min(code1, code2), max(code1, code2)
+        sets.setdefault(code1, [code1]).append(code2)
+    for confusable_set in sets.values():
+        for code1 in confusable_set:
+            get(code1).confusables = [code2 for code2 in confusable_set if code2 != code1]
+    for code, sequence in confusables.sequences:
+        get(code).combinables.append(sequence)
+    for code1, code2 in parsers.parse_casefolding(os.path.join(cache_dir, CASEFOLDING_TARGET)):
+        get(code1).case = code2
+        get(code2).case = code1
+    for code, name in parsers.parse_unihan(os.path.join(cache_dir, UNIHAN_TARGET)):
+        get(code).info.name = name
+    for code, name in parsers.parse_hangul(os.path.join(cache_dir, HANGUL_TARGET)):
+        if get(code).info.name == "<unassigned>":
+            get(code).info.name = name
+
+    last: typing.Optional[LegacyCodepoint] = None
+    for codepoint in codepoints:
+        if codepoint is None:
+            continue
+        if last is not None:
+            last.next = codepoint.info.codepoint
+            codepoint.prev = last.info.codepoint
+        last = codepoint
+    return LegacyData(blocks, subblocks, codepoints)
+
+
+@click.command()
+@click.option("-d", "--cache-dir", required=True, type=click.Path(exists=True))
+@click.option("-l", "--layout", default="columns", type=click.Choice(["columns", "objects"]))
+@click.option("--name-index/--no-name-index", default=True, help="build the search index (columns only)")
+def main(cache_dir: str, layout: str, name_index: bool) -> None:
+    # the layouts hold the same codepoint data; compare them with --no-name-index, since the objects
+    # layout has no search index
+    gc.collect()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tracemalloc.start()
+    start_time = time.time()
+    if layout == "objects":
+        unicode_info: typing.Any = legacy_load(cache_dir)
+    else:
+        unicode_info = UInfo()
+        unicode_info.load(cache_dir, name_index=name_index)
+    elapsed_time = time.time() - start_time
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    click.echo(f"layout:           {layout}")
+    click.echo(f"load time:        {elapsed_time:.2f}s")
+    click.echo(f"retained memory:  {current / 2**20:.1f} MiB")
+    click.echo(f"peak memory:      {peak / 2**20:.1f} MiB")
+    click.echo(f"max rss increase: {(rss_after - rss_before) / 2**10:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+
+import logging
+import os
+import re
+import time
+import typing
+
+import click
+
+from unicode.codepoint import hex2id
+from unicode.download import BLOCKS_TARGET, CONFUSABLES_TARGET, NAMESLIST_TARGET
+from unicode.parsers import (
+    ConfusablesRecords,
+    NamesListRecords,
+    parse_blocks,
+    parse_confusables,
+    parse_nameslist,
+)
+
+# the parsers before the single-pass rewrite (a regex per line kind, hex2id per code), for comparison
+
+
+def legacy_parse_nameslist(file_name: str, block_ends: typing.Dict[int, int]) -> NamesListRecords:
+    records = NamesListRecords([], [], [], [], [], [])
+    subblocks: typing.Dict[int, typing.List[typing.Any]] = {}
+    with open(file_name, encoding="utf-8") as nameslist_file:
+        codepoint_id: typing.Optional[int] = None
+        codepoint: typing.Optional[int] = None
+        subblock = None
+        blockend = None
+
+        re_x_name_hex = re.compile(r"^\tx \(.* - ([0-9A-F]{4,6})\)$")
+        re_x_hex = re.compile(r"^\tx ([0-9A-F]{4,6})$")
+        re_block_header = re.compile(r"^@@\t([0-9A-F]{4,6})\t(.*)\t([0-9A-F]{4,6})$")
+
+        for line in nameslist_file:
+            if re.match(r"^[0-9A-F]{4,6}\t", line):
+                hex_name = line.split("\t")
+                codepoint_id = hex2id(hex_name[0])
+                if codepoint_id is None or codepoint_id > 0x10FFFF:
+                    raise ValueError(f"invalid code in line: {line}")
+                codepoint = codepoint_id
+                records.names.append((codepoint, hex_name[1].strip()))
+            elif line.startswith("\t="):
+                assert codepoint is not None
+                records.alternates.append((codepoint, line[2:].strip()))
+            elif line.startswith("\t*"):
+                assert codepoint is not None
+                records.comments.append((codepoint, line[2:].strip()))
+            elif line.startswith("\tx"):
+                match = re_x_name_hex.match(line)
+                if match:
+                    codepoint_id2 = hex2id(match.group(1))
+                    if codepoint_id2 is None or codepoint_id2 > 0x10FFFF:
+                        raise ValueError(f"invalid code in line: {line}")
+                    assert codepoint is not None
+                    records.related.append((codepoint, codepoint_id2))
+                    continue
+                match = re_x_hex.match(line)
+                if match:
+                    codepoint_id2 = hex2id(match.group(1))
+                    if codepoint_id2 is None or codepoint_id2 > 0x10FFFF:
+                        raise ValueError(f"invalid code in line: {line}")
+                    assert codepoint is not None
+                    records.related.append((codepoint, codepoint_id2))
+                    continue
+                logging.info("strange related: %s", line)
+            elif line.startswith("@@\t"):
+                if subblock is not None:
+                    subblocks[subblock][1] = blockend
+                subblock = None
+                match = re_block_header.match(line)
+                if match is None:
+                    logging.info("bad block header: %s", line)
+                    continue
+                block_id = hex2id(match.group(1))
+                assert block_id is not None
+                codepoint_id = block_id - 1
+                if block_id in block_ends:
+                    blockend = block_ends[block_id]
+                else:
+                    range_to = hex2id(match.group(3))
+                    assert range_to is not None
+                    blockend = range_to
+                    logging.info("unknown block: %s-%s: %s", match.group(1), match.group(3), match.group(2))
+                    records.blocks.append((block_id, range_to, match.group(2)))
+            elif line.startswith("@\t\t"):
+                assert codepoint_id is not None
+                if subblock is not None:
+                    subblocks[subblock][1] = codepoint_id
+                subblock = codepoint_id + 1
+                subblocks[subblock] = [subblock, None, line[3:].strip()]
+        if subblock is not None:
+            subblocks[subblock][1] = blockend
+    records.subblocks.extend((range_from, range_to, name) for range_from, range_to, name in subblocks.values())
+    return records
+
+
+def legacy_parse_confusables(file_name: str) -> ConfusablesRecords:
+    records = ConfusablesRecords([], [], [])
+    with open(file_name, encoding="utf-8") as confusables_file:
+        hx = r"([0-9A-Fa-f]{4,6})"
+        re_confusable_pair = re.compile(r"^\s*" + hx + r"\s*;\s*" + hx + r"\s*;\s*MA")
+        re_confusable_list2 = re.compile(r"^\s*" + hx + r"\s*;\s*" + hx + r"\s+" + hx + r"\s*;\s*MA")
+        re_confusable_list3 = re.compile(r"^\s*" + hx + r"\s*;\s*" + hx + r"\s+" + hx + r"\s+" + hx + r"\s*;\s*MA")
+        re_confusable_list4 = re.compile(
+            r"^\s*" + hx + r"\s*;\s*" + hx + r"\s+" + hx + r"\s+" + hx + r"\s+" + hx + r"\s*;\s*MA"
+        )
+        for line in confusables_file:
+            line = line.strip()
+            if line.startswith("#") or line == "":
+                continue
+            fields = line.split(";", 3)
+            if len(fields) >= 3 and fields[2].split("#", 1)[0].strip() == "MA":
+                source = hex2id(fields[0].strip())
+                targets = [hex2id(target) for target in fields[1].split()]
+                if source is not None and targets and None not in targets:
+                    records.mappings.append((source, typing.cast(typing.List[int], targets)))
+            match = re_confusable_pair.match(line)
+            if match:
+                codepoint_id1 = hex2id(match.group(1))
+                codepoint_id2 = hex2id(match.group(2))
+                assert codepoint_id1 is not None
+                assert codepoint_id2 is not None
+                records.pairs.append((codepoint_id1, codepoint_id2))
+                continue
+            for re_list in [
+                re_confusable_list2,
+                re_confusable_list3,
+                re_confusable_list4,
+            ]:
+                match = re_list.match(line)
+                if match:
+                    codepoint_id = hex2id(match.group(1))
+                    assert codepoint_id is not None
+                    records.sequences.append(
+                        (codepoint_id, list(filter(None, [hex2id(group) for group in match.groups()[1:]])))
+                    )
+                    break
+    return records
+
+
+def best_time(parse: typing.Callable[[], typing.Any], repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        parse()
+        times.append(time.perf_counter() - start_time)
+    return min(times)
+
+
+def count_lines(file_name: str) -> int:
+    with open(file_name, encoding="utf-8") as lines_file:
+        return sum(1 for _ in lines_file)
+
+
+def file_version(file_name: str) -> str:
+    # from the header: "@@@\tThe Unicode Standard 14.0.0" (NamesList) or "# Version: 13.0.0" (confusables)
+    re_version = re.compile(r"^(?:@@@\tThe Unicode Standard|# Version:) (\S+)")
+    with open(file_name, encoding="utf-8-sig") as lines_file:
+        for _, line in zip(range(20), lines_file):
+            match = re_version.match(line)
+            if match:
+                return match.group(1)
+    return "unknown version"
+
+
+@click.command()
+@click.option("-d", "--cache-dir", required=True, type=click.Path(exists=True))
+@click.option("-n", "--repeat", default=5, type=int)
+def main(cache_dir: str, repeat: int) -> None:
+    # the parsers log strange lines at info level
+    logging.disable(logging.INFO)
+    nameslist_file = os.path.join(cache_dir, NAMESLIST_TARGET)
+    confusables_file = os.path.join(cache_dir, CONFUSABLES_TARGET)
+    block_ends = {
+        range_from: range_to for range_from, range_to, _ in parse_blocks(os.path.join(cache_dir, BLOCKS_TARGET))
+    }
+    assert parse_nameslist(nameslist_file, block_ends) == legacy_parse_nameslist(nameslist_file, block_ends)
+    assert parse_confusables(confusables_file) == legacy_parse_confusables(confusables_file)
+
+    benchmarks: typing.List[typing.Tuple[str, typing.List[typing.Tuple[str, typing.Callable[[], typing.Any]]]]] = [
+        (
+            nameslist_file,
+            [
+                ("legacy", lambda: legacy_parse_nameslist(nameslist_file, block_ends)),
+                ("single-pass", lambda: parse_nameslist(nameslist_file, block_ends)),
+            ],
+        ),
+        (
+            confusables_file,
+            [
+                ("legacy", lambda: legacy_parse_confusables(confusables_file)),
+                ("single-pass", lambda: parse_confusables(confusables_file)),
+            ],
+        ),
+    ]
+    for file_name, parsers in benchmarks:
+        lines = count_lines(file_name)
+        click.echo(f"{os.path.basename(file_name)} ({file_version(file_name)}): {lines} lines")
+        results = []
+        for name, parse in parsers:
+            elapsed_time = best_time(parse, repeat)
+            results.append(elapsed_time)
+            click.echo(f"  {name:12} {lines / elapsed_time:10.0f} lines/s (best of {repeat})")
+        click.echo(f"  speedup: {results[0] / results[1]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
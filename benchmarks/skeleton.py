@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+import os
+import random
+import time
+import typing
+import unicodedata
+
+import click
+
+from unicode.confusables import SkeletonTable
+from unicode.download import CONFUSABLES_TARGET
+from unicode.parsers import parse_confusables
+
+
+def naive_skeleton(mappings: typing.Dict[int, str], string: str) -> str:
+    # per character lookups and concatenation
+    result = ""
+    for char in unicodedata.normalize("NFD", string):
+        result += mappings.get(ord(char), char)
+    return unicodedata.normalize("NFD", result)
+
+
+@click.command()
+@click.option("-d", "--cache-dir", required=True, type=click.Path(exists=True))
+@click.option("-n", "--count", default=1000000, type=int)
+def main(cache_dir: str, count: int) -> None:
+    records = parse_confusables(os.path.join(cache_dir, CONFUSABLES_TARGET))
+    table = SkeletonTable(records.mappings)
+    mappings = {source: "".join(map(chr, targets)) for source, targets in reversed(records.mappings)}
+    # ascii user names; every tenth one contains a (non-ascii) confusable source
+    rng = random.Random(0)
+    alphabet = "abcdefghijklmnopqrstuvwxyz0123456789_"
+    sources = [chr(source) for source, _ in records.mappings if source > 0x7F]
+    names = ["".join(rng.choice(alphabet) for _ in range(rng.randint(4, 16))) for _ in range(count)]
+    for i in range(0, count, 10):
+        position = rng.randrange(len(names[i]))
+        names[i] = names[i][:position] + rng.choice(sources) + names[i][position + 1 :]
+    click.echo(f"{len(table)} mappings, {count} names")
+
+    start_time = time.time()
+    expected = [naive_skeleton(mappings, name) for name in names]
+    naive_time = time.time() - start_time
+
+    start_time = time.time()
+    skeletons = table.skeletons(names)
+    table_time = time.time() - start_time
+    assert skeletons == expected
+
+    start_time = time.time()
+    seen: typing.Dict[str, str] = {}
+    collisions = 0
+    for name, skeleton in zip(names, skeletons):
+        if seen.setdefault(skeleton, name) != name:
+            collisions += 1
+    collision_time = time.time() - start_time
+
+    click.echo(f"naive:     {count / naive_time:10.0f} names/s")
+    click.echo(f"translate: {count / table_time:10.0f} names/s")
+    click.echo(f"confusable pairs found via skeleton dict: {collisions} in {collision_time:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
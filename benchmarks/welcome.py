@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+import random
+import time
+import typing
+
+import click
+
+from unicode import app
+from unicode.codepoint import CodepointInfo
+from unicode.uinfo import RANDOM_BLOCKS, UInfo
+
+
+def legacy_random_char_infos(uinfo: UInfo, count: int) -> typing.List[CodepointInfo]:
+    # the previous implementation, which collected the candidates on every request
+    candidates = []
+    for block_id in RANDOM_BLOCKS:
+        block = uinfo.get_block(block_id)
+        if block is not None:
+            for i in block.codepoints_iter():
+                candidates.append(i)
+    return list(filter(None, [uinfo.get_codepoint_info(code) for code in random.sample(candidates, count)]))
+
+
+def measure(function: typing.Callable[[], typing.Any], repeat: int) -> float:
+    function()
+    start_time = time.time()
+    for _ in range(repeat):
+        function()
+    return (time.time() - start_time) / repeat
+
+
+@click.command()
+@click.option("-d", "--cache-dir", required=True, type=click.Path(exists=True))
+@click.option("-n", "--requests", default=1000, type=int)
+def main(cache_dir: str, requests: int) -> None:
+    uinfo = app.unicode_info
+    uinfo.load(cache_dir)
+    client = app.flask_app.test_client()
+    pooled_function = uinfo.get_random_char_infos
+    for name, function in [
+        ("legacy", lambda count: legacy_random_char_infos(uinfo, count)),
+        ("pooled", pooled_function),
+    ]:
+        setattr(uinfo, "get_random_char_infos", function)
+        sample_time = measure(lambda: uinfo.get_random_char_infos(32), requests)
+        route_time = measure(lambda: client.get("/"), requests)
+        click.echo(f"{name}: sampling {sample_time * 1e6:.1f}us, welcome route {route_time * 1000:.2f}ms")
+    setattr(uinfo, "get_random_char_infos", pooled_function)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,3 +2,21 @@ BASE_URL = '''http://localhost:5000'''
 META = '''<!-- some tags for the header (e.g. host validation hashes) -->'''
 BOTTOM = '''<!-- some html to put at the bottom (e.g. tracking) -->'''
 # CACHE_DIR = "your/cache/dir"
+# SNAPSHOT = True  # load the parsed data from a snapshot (if it is up-to-date), written by 'unicode build-snapshot'
+#   or after loading the data files
+# SNAPSHOT_FILE = "your/cache/dir/uinfo.snapshot"
+# LOAD_WORKERS = 0  # >1: parse the data files in a process pool; saves at most ~10%, since merging dominates
+# UNIHAN_FIELDS = ["kMandarin", "kCantonese", "kJapaneseOn", "kJapaneseKun", "kRSUnicode", "kTotalStrokes"]
+# WIKIPEDIA_PREFETCH = True  # fetch the wikipedia summaries of all blocks in the background at startup
+# WIKIPEDIA_TTL = 30 * 24 * 60 * 60  # seconds until a cached wikipedia summary is refreshed
+# WIKIPEDIA_WORKERS = 2
+# RANDOM_BLOCKS = [0x0180, 0x0250, 0x1F600, 0x1F0A0, 0x1F680, 0x0370, 0x0900, 0x0700, 0x0400, 0x2200, 0x2190]
+# CACHE_CONTROL = "public, max-age=3600"  # Cache-Control header of the codepoint and block pages
+# RENDER_CACHE_BYTES = 64 * 2**20  # memory budget of the rendered pages cache (per process)
+# RENDER_CACHE_DIR = "/dev/shm/unicode-pages"  # share rendered pages between processes
+# RENDER_CACHE_DIR_BYTES = 256 * 2**20  # budget of RENDER_CACHE_DIR (shared by all processes); oldest pages go first
+# API_MAX_CODES = 10000  # maximum number of codes, strings or pairs per /api/... request
+# BLOCK_PAGE_SIZE = 1024  # codepoints per block page (/b/<block>/<page>; /b/<block>/all shows all of them)
+# RELOAD_TOKEN = "some secret"  # enables POST /admin/reload with "Authorization: Bearer <token>" (or send SIGHUP);
+#   the data is reloaded from the cache dir, POST /admin/reload?revalidate=1 (or SIGUSR1) fetches changed files first
+# UNICODE_VERSIONS = ["15.1.0"]  # additional versions, served at /v/<version>/... with their changes at /v/<version>/diff
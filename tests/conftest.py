@@ -0,0 +1,83 @@
+import os
+import typing
+import zipfile
+
+import pytest
+from flask.testing import FlaskClient
+
+from unicode import app
+from unicode.download import UNICODE
+from unicode.uinfo import UInfo
+from unicode.versions import load_versions, version_dir
+
+BLOCKS = [
+    (0x0000, 0x007F, "Basic Latin"),
+    (0x4E00, 0x9FFF, "CJK Unified Ideographs"),
+    (0x2CEB0, 0x2EBEF, "CJK Unified Ideographs Extension F"),
+    (0x30000, 0x3134F, "CJK Unified Ideographs Extension G"),
+]
+
+# a few lines of each Unihan member, in the format of the released files
+UNIHAN_READINGS = [
+    ("U+4E00", "kDefinition", "one; a, an; alone"),
+    ("U+4E00", "kMandarin", "yī"),
+    ("U+2CEB0", "kDefinition", "ext f test ideograph"),
+    ("U+2CEB0", "kMandarin", "tè"),
+    ("U+30000", "kDefinition", "ext g test ideograph"),
+    ("U+30000", "kMandarin", "jī"),
+]
+UNIHAN_IRG_SOURCES = [
+    ("U+4E00", "kTotalStrokes", "1"),
+    ("U+2CEB0", "kTotalStrokes", "5"),
+    ("U+30000", "kTotalStrokes", "7"),
+]
+
+
+def write_data_files(directory: str, names: typing.Dict[int, str]) -> None:
+    # a minimal data set: the blocks above, 'names' in the names list and a few Unihan entries
+    os.makedirs(directory, exist_ok=True)
+
+    def write(target: str, lines: typing.Iterable[str]) -> None:
+        with open(os.path.join(directory, target), "w", encoding="utf-8") as data_file:
+            data_file.writelines(f"{line}\n" for line in lines)
+
+    write("Blocks.txt", [f"{range_from:04X}..{range_to:04X}; {name}" for range_from, range_to, name in BLOCKS])
+    nameslist = []
+    for range_from, range_to, block_name in BLOCKS:
+        nameslist.append(f"@@\t{range_from:04X}\t{block_name}\t{range_to:04X}")
+        nameslist.extend(
+            f"{code:04X}\t{name}" for code, name in sorted(names.items()) if range_from <= code <= range_to
+        )
+    write("NamesList.txt", nameslist)
+    write("CaseFolding.txt", ["0041; C; 0061; # LATIN CAPITAL LETTER A"])
+    write("confusables.txt", [])
+    write("hangul.txt", [])
+    write("wikipedia.html", [])
+    with zipfile.ZipFile(os.path.join(directory, "Unihan.zip"), "w") as archive:
+        archive.writestr("Unihan_Readings.txt", "".join(f"{line}\n" for line in map("\t".join, UNIHAN_READINGS)))
+        archive.writestr("Unihan_IRGSources.txt", "".join(f"{line}\n" for line in map("\t".join, UNIHAN_IRG_SOURCES)))
+
+
+@pytest.fixture(name="data_dir")
+def fixture_data_dir(tmp_path: typing.Any) -> str:
+    # the primary version and 15.1.0, which adds a name
+    names = {0x41: "LATIN CAPITAL LETTER A", 0x61: "LATIN SMALL LETTER A"}
+    write_data_files(str(tmp_path), names)
+    write_data_files(version_dir(str(tmp_path), "15.1.0"), {**names, 0x42: "LATIN CAPITAL LETTER B"})
+    return str(tmp_path)
+
+
+@pytest.fixture(name="uinfo")
+def fixture_uinfo(data_dir: str) -> UInfo:
+    uinfo = UInfo()
+    uinfo.load(data_dir)
+    return uinfo
+
+
+@pytest.fixture(name="client")
+def fixture_client(data_dir: str, uinfo: UInfo, monkeypatch: pytest.MonkeyPatch) -> typing.Iterator[FlaskClient]:
+    monkeypatch.setitem(app.flask_app.config, "WIKIPEDIA_PREFETCH", False)
+    previous_versions = app.active_versions
+    app.activate_versions(load_versions(uinfo, UNICODE, data_dir, ["15.1.0"]))
+    yield app.flask_app.test_client()
+    app.activate_versions(previous_versions)
@@ -0,0 +1,56 @@
+import os
+import typing
+
+from unicode.render_cache import RenderCache
+
+
+def render(text: str) -> typing.Callable[[], str]:
+    return lambda: text
+
+
+def directory_size(directory: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(path, file_name))
+        for path, _, file_names in os.walk(directory)
+        for file_name in file_names
+    )
+
+
+def test_directory_stays_within_budget(tmp_path: str) -> None:
+    directory = os.path.join(tmp_path, "pages")
+    cache = RenderCache(0, directory, 16 * 1024)
+    for index in range(200):
+        page = cache.get_or_render("v1", f"page-{index}", render(f"{index:04d}" * 256))
+        assert page == f"{index:04d}".encode("utf-8") * 256
+        assert directory_size(directory) <= 16 * 1024
+    stats = cache.stats()
+    assert stats["file_evictions"] > 0
+    assert stats["file_bytes"] == directory_size(directory)
+
+
+def test_directory_budget_counts_pages_of_other_processes(tmp_path: str) -> None:
+    directory = os.path.join(tmp_path, "pages")
+    RenderCache(0, directory, 2**20).get_or_render("v1", "other", render("x" * 12 * 1024))
+    cache = RenderCache()
+    cache.configure(0, directory, 16 * 1024)
+    assert cache.stats()["file_bytes"] == 12 * 1024
+    for index in range(10):
+        cache.get_or_render("v1", f"page-{index}", render("y" * 1024))
+        assert directory_size(directory) <= 16 * 1024
+
+
+def test_pages_of_dropped_versions_are_not_stored(tmp_path: str) -> None:
+    directory = os.path.join(tmp_path, "pages")
+    cache = RenderCache(2**20, directory)
+    cache.drop_other_versions("v1")
+
+    def render_during_swap() -> str:
+        # the version swap happens while an old version request is rendering
+        cache.drop_other_versions("v2")
+        return "old page"
+
+    assert cache.get_or_render("v1", "page", render_during_swap) == b"old page"
+    assert cache.stats()["pages"] == 0
+    assert not os.path.exists(os.path.join(directory, "v1"))
+    assert cache.get_or_render("v2", "page", render("new page")) == b"new page"
+    assert cache.stats()["pages"] == 1
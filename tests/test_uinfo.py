@@ -0,0 +1,11 @@
+from unicode.uinfo import UInfo
+
+
+def test_unihan_fields_of_extension_f_and_g(uinfo: UInfo) -> None:
+    assert uinfo.get_unihan(0x4E00) == [("Mandarin", "yī"), ("Total Strokes", "1")]
+    assert uinfo.get_unihan(0x2CEB0) == [("Mandarin", "tè"), ("Total Strokes", "5")]
+    assert uinfo.get_unihan(0x30000) == [("Mandarin", "jī"), ("Total Strokes", "7")]
+
+
+def test_no_unihan_fields_outside_of_cjk_blocks(uinfo: UInfo) -> None:
+    assert not uinfo.get_unihan(0x41)
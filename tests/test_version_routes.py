@@ -0,0 +1,18 @@
+import re
+
+from flask.testing import FlaskClient
+
+
+def test_all_link_of_versioned_paged_block(client: FlaskClient) -> None:
+    response = client.get("/v/15.1.0/b/4E00/2")
+    assert response.status_code == 200
+    links = re.findall(r'<a href="([^"]*)" rel="nofollow">All</a>', response.get_data(as_text=True))
+    assert links == ["/v/15.1.0/b/4E00/all"]
+
+    response = client.get(links[0])
+    assert response.status_code == 200
+    assert "<b>All</b>" in response.get_data(as_text=True)
+
+
+def test_all_page_of_unknown_version(client: FlaskClient) -> None:
+    assert client.get("/v/1.0.0/b/4E00/all").status_code == 404
@@ -0,0 +1,131 @@
+import re
+import typing
+
+from unicode.block import Block
+from unicode.codepoint import Codepoint
+from unicode.uinfo import UInfo
+
+MAX_CODES = 10000
+
+Record = typing.Dict[str, typing.Any]
+
+
+class RequestError(Exception):
+    pass
+
+
+def _code(code: typing.Optional[int]) -> typing.Optional[str]:
+    return None if code is None else f"{code:04X}"
+
+
+def _block(uinfo: UInfo, block_id: typing.Optional[int]) -> typing.Optional[Record]:
+    info = uinfo.get_block_info(block_id)
+    return None if info is None else {"id": _code(info.block_id()), "name": info.name()}
+
+
+def _subblock(uinfo: UInfo, subblock_id: typing.Optional[int]) -> typing.Optional[Record]:
+    subblock = uinfo.get_subblock(subblock_id)
+    return None if subblock is None else {"id": _code(subblock.block_id()), "name": subblock.name()}
+
+
+# field name -> value of a codepoint
+CODEPOINT_FIELDS: typing.Dict[str, typing.Callable[[UInfo, Codepoint], typing.Any]] = {
+    "name": lambda uinfo, codepoint: codepoint.name(),
+    "string": lambda uinfo, codepoint: codepoint.get_string(),
+    "block": lambda uinfo, codepoint: _block(uinfo, codepoint.block),
+    "subblock": lambda uinfo, codepoint: _subblock(uinfo, codepoint.subblock),
+    "case": lambda uinfo, codepoint: _code(codepoint.case),
+    "prev": lambda uinfo, codepoint: _code(codepoint.prev),
+    "next": lambda uinfo, codepoint: _code(codepoint.next),
+    "alternate": lambda uinfo, codepoint: codepoint.alternate,
+    "comments": lambda uinfo, codepoint: codepoint.comments,
+    "related": lambda uinfo, codepoint: [_code(code) for code in codepoint.related],
+    "confusables": lambda uinfo, codepoint: [_code(code) for code in codepoint.confusables],
+    "combinables": lambda uinfo, codepoint: [[_code(code) for code in sequence] for sequence in codepoint.combinables],
+}
+DEFAULT_CODEPOINT_FIELDS = ["name", "block", "subblock", "case", "related", "confusables", "combinables"]
+
+BLOCK_FIELDS: typing.Dict[str, typing.Callable[[UInfo, Block], typing.Any]] = {
+    "name": lambda uinfo, block: block.name(),
+    "range": lambda uinfo, block: [_code(block.from_codepoint()), _code(block.to_codepoint())],
+    "prev": lambda uinfo, block: _code(block.prev),
+    "next": lambda uinfo, block: _code(block.next),
+    "wikipedia": lambda uinfo, block: block.wikipedia,
+}
+DEFAULT_BLOCK_FIELDS = ["name", "range", "prev", "next", "wikipedia"]
+
+
+def parse_codes(specs: typing.Iterable[str], limit: int = MAX_CODES) -> typing.List[int]:
+    # comma separated codes ('0041', 'U+0041') and ranges ('0041-007F', 'U+0041..U+007F')
+    codes: typing.List[int] = []
+    re_range = re.compile(r"^(?:U\+)?([0-9A-F]{1,6})(?:(?:-|\.\.)(?:U\+)?([0-9A-F]{1,6}))?$", re.IGNORECASE)
+    for spec in specs:
+        for item in spec.split(","):
+            item = item.strip()
+            if not item:
+                continue
+            match = re_range.match(item)
+            if match is None:
+                raise RequestError(f"bad code or range: {item}")
+            range_from = int(match.group(1), 16)
+            range_to = int(match.group(2), 16) if match.group(2) else range_from
+            if range_to < range_from:
+                raise RequestError(f"bad range: {item}")
+            if len(codes) + range_to + 1 - range_from > limit:
+                raise RequestError(f"too many codes (limit: {limit})")
+            codes.extend(range(range_from, range_to + 1))
+    return codes
+
+
+def parse_fields(
+    specs: typing.Iterable[str], available: typing.Iterable[str], default: typing.List[str]
+) -> typing.List[str]:
+    fields = [field.strip() for spec in specs for field in spec.split(",") if field.strip()]
+    if not fields:
+        return default
+    unknown = [field for field in fields if field not in available]
+    if unknown:
+        raise RequestError(f"unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def codepoint_records(uinfo: UInfo, codes: typing.Iterable[int], fields: typing.List[str]) -> Record:
+    getters = [(field, CODEPOINT_FIELDS[field]) for field in fields]
+    records = []
+    unknown = []
+    for code in codes:
+        codepoint = uinfo.get_codepoint(code)
+        if codepoint is None:
+            unknown.append(_code(code))
+            continue
+        record: Record = {"code": _code(code)}
+        for field, getter in getters:
+            record[field] = getter(uinfo, codepoint)
+        records.append(record)
+    return {"codepoints": records, "unknown": unknown}
+
+
+def block_records(uinfo: UInfo, codes: typing.List[int], fields: typing.List[str]) -> Record:
+    # a code selects the block containing it, so a block can be selected by any of its codepoints;
+    # without codes, all blocks are returned
+    if not codes:
+        codes = [info.block_id() for info in uinfo.get_block_infos()]
+    getters = [(field, BLOCK_FIELDS[field]) for field in fields]
+    records = []
+    unknown = []
+    seen = set()
+    for code in codes:
+        block_id = uinfo.get_block_id_by_codepoint(code)
+        if block_id is None:
+            unknown.append(_code(code))
+            continue
+        if block_id in seen:
+            continue
+        seen.add(block_id)
+        block = uinfo.get_block(block_id)
+        assert block is not None
+        record: Record = {"id": _code(block_id)}
+        for field, getter in getters:
+            record[field] = getter(uinfo, block)
+        records.append(record)
+    return {"blocks": records, "unknown": unknown}
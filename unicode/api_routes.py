@@ -0,0 +1,94 @@
+import typing
+
+from flask import jsonify, request, stream_with_context
+from werkzeug.wrappers import Response
+
+from unicode import api, app
+from unicode.inspection import inspect_stream, read_chunks
+
+
+@app.flask_app.route("/api/codepoints", methods=["GET", "POST"])
+def api_codepoints() -> typing.Union[Response, typing.Tuple[Response, int]]:
+    try:
+        codes = api.parse_codes(api_arguments("codes"), app.flask_app.config.get("API_MAX_CODES", api.MAX_CODES))
+        fields = api.parse_fields(api_arguments("fields"), api.CODEPOINT_FIELDS, api.DEFAULT_CODEPOINT_FIELDS)
+    except api.RequestError as error:
+        return jsonify({"error": str(error)}), 400
+    return jsonify(api.codepoint_records(app.current_unicode_info(), codes, fields))
+
+
+@app.flask_app.route("/api/blocks", methods=["GET", "POST"])
+def api_blocks() -> typing.Union[Response, typing.Tuple[Response, int]]:
+    try:
+        codes = api.parse_codes(api_arguments("codes"), app.flask_app.config.get("API_MAX_CODES", api.MAX_CODES))
+        fields = api.parse_fields(api_arguments("fields"), api.BLOCK_FIELDS, api.DEFAULT_BLOCK_FIELDS)
+    except api.RequestError as error:
+        return jsonify({"error": str(error)}), 400
+    return jsonify(api.block_records(app.current_unicode_info(), codes, fields))
+
+
+@app.flask_app.route("/api/inspect", methods=["POST"])
+def api_inspect() -> Response:
+    # the (utf-8) request body is read and answered as a stream of json lines, one per character
+    if request.mimetype in ("application/x-www-form-urlencoded", "multipart/form-data"):
+        chunks: typing.Iterable[bytes] = [request.form.get("text", "").encode("utf-8")]
+    else:
+        chunks = read_chunks(request.stream)
+    return app.flask_app.response_class(
+        stream_with_context(inspect_stream(app.current_unicode_info(), chunks)), mimetype="application/x-ndjson"
+    )
+
+
+@app.flask_app.route("/api/skeleton", methods=["GET", "POST"])
+def api_skeleton() -> typing.Union[Response, typing.Tuple[Response, int]]:
+    strings = api_values("s")
+    limit = app.flask_app.config.get("API_MAX_CODES", api.MAX_CODES)
+    if len(strings) > limit:
+        return jsonify({"error": f"too many strings (limit: {limit})"}), 400
+    skeletons = app.unicode_info.skeleton_table().skeletons(strings)
+    return jsonify({"skeletons": [{"s": string, "skeleton": skeleton} for string, skeleton in zip(strings, skeletons)]})
+
+
+@app.flask_app.route("/api/confusable", methods=["GET", "POST"])
+def api_confusable() -> typing.Union[Response, typing.Tuple[Response, int]]:
+    # one pair as a/b parameters, or many pairs as a json body {"pairs": [[a, b], ...]}
+    body = request.get_json(silent=True) if request.is_json else None
+    if isinstance(body, dict) and "pairs" in body:
+        pairs = body["pairs"]
+        if not isinstance(pairs, list) or not all(
+            isinstance(pair, list) and len(pair) == 2 and all(isinstance(string, str) for string in pair)
+            for pair in pairs
+        ):
+            return jsonify({"error": "pairs must be a list of [string, string]"}), 400
+        limit = app.flask_app.config.get("API_MAX_CODES", api.MAX_CODES)
+        if len(pairs) > limit:
+            return jsonify({"error": f"too many pairs (limit: {limit})"}), 400
+    else:
+        if "a" not in request.values or "b" not in request.values:
+            return jsonify({"error": "missing a or b"}), 400
+        pairs = [[request.values["a"], request.values["b"]]]
+    skeletons = app.unicode_info.skeleton_table().skeletons(string for pair in pairs for string in pair)
+    results = [
+        {"a": a, "b": b, "confusable": skeletons[2 * i] == skeletons[2 * i + 1]} for i, (a, b) in enumerate(pairs)
+    ]
+    return jsonify({"results": results})
+
+
+def api_values(name: str) -> typing.List[str]:
+    # uninterpreted strings from repeated query/form parameters or a list in a json body
+    if not request.is_json:
+        return request.values.getlist(name)
+    body = request.get_json(silent=True)
+    values = body.get(name, []) if isinstance(body, dict) else []
+    return [str(value) for value in (values if isinstance(values, list) else [values])]
+
+
+def api_arguments(name: str) -> typing.List[str]:
+    # query/form parameters (comma separated, may be repeated) or a list in a json body
+    if not request.is_json:
+        return request.values.getlist(name)
+    body = request.get_json(silent=True)
+    values = body.get(name, []) if isinstance(body, dict) else []
+    if not isinstance(values, list):
+        values = [values]
+    return [f"{value:X}" if isinstance(value, int) else str(value) for value in values]
@@ -1,33 +1,202 @@
 import logging
 import os
+import threading
 import typing
+import zlib
 
 import appdirs  # type: ignore
-from flask import Flask, render_template, url_for, request, redirect
-from flask_caching import Cache  # type: ignore
+from flask import Flask, render_template, url_for, request, redirect, stream_template
+from flask import g, has_app_context
+from werkzeug.local import LocalProxy
 from werkzeug.wrappers import Response
 
-from unicode.codepoint import hex2id
-from unicode.download import fetch_data_files
+from unicode.block import Block
+from unicode.codepoint import CodepointInfo, hex2id
+from unicode import snapshot
+from unicode.download import DATA_FILES, UNICODE, checksums, fetch_data_files, sources
+from unicode.render_cache import RenderCache
+from unicode.summaries import SummaryCache, topic_from_url
 from unicode.uinfo import UInfo
+from unicode.versions import VersionSet, load_versions, version_dir
 
 
-flask_app = Flask(__name__)
-cache = Cache(flask_app, config={"CACHE_TYPE": "simple"})
-unicode_info = UInfo()
+# codepoints per block page
+BLOCK_PAGE_SIZE = 1024
+
+flask_app: Flask = Flask(__name__)
+render_cache = RenderCache()
+# the data sets (of all served Unicode versions) that new requests are served from; replaced as a whole by
+# a reload
+active_versions = VersionSet(UNICODE, {UNICODE: UInfo()})
+_reload_lock = threading.Lock()
+summaries = SummaryCache()
 
 StrIntT = typing.Tuple[str, int]
+BytesIntT = typing.Tuple[bytes, int]
+
+
+def current_unicode_info() -> UInfo:
+    # a request keeps using the data set that was active when it started, also across a reload
+    if has_app_context() and "unicode_info" in g:
+        return typing.cast(UInfo, g.unicode_info)
+    return active_versions.primary()
+
+
+def current_versions() -> VersionSet:
+    if has_app_context() and "unicode_versions" in g:
+        return typing.cast(VersionSet, g.unicode_versions)
+    return active_versions
+
+
+# resolves to current_unicode_info() on every access; hot loops should get the instance once instead
+unicode_info = typing.cast(UInfo, LocalProxy(current_unicode_info))
+
+
+@flask_app.before_request
+def bind_unicode_info() -> None:
+    versions = active_versions
+    g.unicode_versions = versions
+    g.unicode_info = versions.primary()
+
+
+def use_version(version: str) -> bool:
+    # serves the rest of the request from the data of another Unicode version
+    uinfo = current_versions().get(version)
+    if uinfo is None:
+        return False
+    g.unicode_info = uinfo
+    return True
 
 
 def configure(config_file_name: str, reset_cache: bool) -> None:
+    cache_dir = prepare_data(config_file_name, reset_cache)
+    summaries.configure(
+        os.path.join(cache_dir, "wikipedia-summaries.json"),
+        flask_app.config.get("WIKIPEDIA_TTL", 30 * 24 * 60 * 60),
+        flask_app.config.get("WIKIPEDIA_WORKERS", 2),
+    )
+    render_cache.configure(
+        flask_app.config.get("RENDER_CACHE_BYTES", 64 * 2**20),
+        flask_app.config.get("RENDER_CACHE_DIR"),
+        flask_app.config.get("RENDER_CACHE_DIR_BYTES", 256 * 2**20),
+    )
+    activate_versions(create_versions(create_unicode_info(cache_dir), cache_dir))
+
+
+def create_unicode_info(cache_dir: str) -> UInfo:
+    uinfo = UInfo()
+    source_fingerprint = snapshot.fingerprint(checksums(cache_dir, DATA_FILES))
+    use_snapshot = flask_app.config.get("SNAPSHOT", True)
+    if not use_snapshot or not uinfo.load_snapshot(snapshot_file_name(cache_dir), source_fingerprint):
+        uinfo.load(cache_dir, flask_app.config.get("LOAD_WORKERS", 0))
+        if use_snapshot:
+            # the next start (or reload) of the same data loads the snapshot instead
+            try:
+                uinfo.save_snapshot(snapshot_file_name(cache_dir), source_fingerprint)
+            except OSError as error:
+                logging.warning("failed to write snapshot: %s", error)
+    if "UNIHAN_FIELDS" in flask_app.config:
+        uinfo.set_unihan_fields(flask_app.config["UNIHAN_FIELDS"])
+    if "RANDOM_BLOCKS" in flask_app.config:
+        uinfo.set_random_blocks(flask_app.config["RANDOM_BLOCKS"])
+    return uinfo
+
+
+def create_versions(primary: UInfo, cache_dir: str) -> VersionSet:
+    return load_versions(primary, UNICODE, cache_dir, extra_versions(), flask_app.config.get("LOAD_WORKERS", 0))
+
+
+def extra_versions() -> typing.List[str]:
+    return [version for version in flask_app.config.get("UNICODE_VERSIONS", []) if version != UNICODE]
+
+
+def activate_versions(versions: VersionSet) -> None:
+    global active_versions  # pylint: disable=global-statement,invalid-name
+    # a single reference assignment: each request sees either the old or the new data sets
+    active_versions = versions
+    render_cache.drop_other_versions(*versions.data_versions())
+    if flask_app.config.get("WIKIPEDIA_PREFETCH", True):
+        summaries.prefetch(topic_from_url(url) for url in wikipedia_urls(versions.primary()))
+
+
+def wikipedia_urls(uinfo: UInfo) -> typing.List[str]:
+    urls = []
+    for block_info in uinfo.get_block_infos():
+        block = uinfo.get_block(block_info.block_id())
+        if block is not None and block.wikipedia:
+            urls.append(block.wikipedia)
+    return urls
+
+
+def load_data(revalidate: bool = False) -> VersionSet:
+    # loads the data sets from the cache dir, with 'revalidate' after fetching changed data files from the
+    # servers; the active data sets are not touched
+    cache_dir = data_dir()
+    if revalidate:
+        fetch_all_data_files(cache_dir, True)
+    return create_versions(create_unicode_info(cache_dir), cache_dir)
+
+
+def reload_unicode_info(revalidate: bool = False) -> None:
+    # activates newly loaded data sets; the old ones are served meanwhile
+    versions = load_data(revalidate)
+    logging.info("reloaded data: %s -> %s", active_versions.primary().data_version(), versions.primary().data_version())
+    activate_versions(versions)
+
+
+def start_reload(revalidate: bool = False) -> bool:
+    # reloads in a background thread; returns False if a reload is already running
+    if not _reload_lock.acquire(blocking=False):  # pylint: disable=consider-using-with
+        return False
+
+    def run() -> None:
+        try:
+            reload_unicode_info(revalidate)
+        except Exception:  # pylint: disable=broad-except
+            logging.exception("reload failed, still serving %s", active_versions.primary().data_version())
+        finally:
+            _reload_lock.release()
+
+    threading.Thread(target=run, name="reload", daemon=True).start()
+    return True
+
+
+# called by the reload endpoint; the pre-forking server replaces it to reload in the supervisor
+reload_trigger: typing.Callable[[bool], bool] = start_reload
+
+
+def build_snapshot(config_file_name: str, reset_cache: bool) -> str:
+    cache_dir = prepare_data(config_file_name, reset_cache)
+    source_fingerprint = snapshot.fingerprint(checksums(cache_dir, DATA_FILES))
+    file_name = snapshot_file_name(cache_dir)
+    unicode_info.load(cache_dir, flask_app.config.get("LOAD_WORKERS", 0))
+    unicode_info.save_snapshot(file_name, source_fingerprint)
+    return file_name
+
+
+def prepare_data(config_file_name: str, reset_cache: bool) -> str:
     flask_app.config.from_pyfile(os.path.abspath(config_file_name))
+    cache_dir = data_dir()
+    fetch_all_data_files(cache_dir, reset_cache)
+    return cache_dir
 
-    if "CACHE_DIR" in flask_app.config:
-        cache_dir = flask_app.config["CACHE_DIR"]
-    else:
-        cache_dir = os.path.join(appdirs.user_cache_dir("flopp.unicode"))
+
+def fetch_all_data_files(cache_dir: str, reset_cache: bool) -> None:
     fetch_data_files(cache_dir, reset_cache)
-    unicode_info.load(cache_dir)
+    for version in extra_versions():
+        fetch_data_files(version_dir(cache_dir, version), reset_cache, sources(version))
+
+
+def data_dir() -> str:
+    if "CACHE_DIR" in flask_app.config:
+        return str(flask_app.config["CACHE_DIR"])
+    return str(os.path.join(appdirs.user_cache_dir("flopp.unicode")))
+
+
+def snapshot_file_name(cache_dir: str) -> str:
+    if "SNAPSHOT_FILE" in flask_app.config:
+        return str(flask_app.config["SNAPSHOT_FILE"])
+    return os.path.join(cache_dir, "uinfo.snapshot")
 
 
 @flask_app.errorhandler(404)
@@ -60,24 +229,27 @@ def welcome() -> StrIntT:
     return render_template("welcome.html", data=data), 200
 
 
-@flask_app.route("/sitemap.txt")
-@cache.memoize(120)
-def sitemap() -> StrIntT:
-    return render_template("sitemap.txt", blocks=unicode_info.get_block_infos()), 200
-
-
-@flask_app.route("/robots.txt")
-@cache.memoize(120)
-def robots() -> StrIntT:
-    return render_template("robots.txt"), 200
-
-
 @flask_app.route("/c/<char_code>")
-@cache.memoize(120)
-def show_code(char_code: str) -> StrIntT:
+def show_code(char_code: str) -> typing.Union[StrIntT, Response]:
     codepoint = unicode_info.get_codepoint(hex2id(char_code.lower()))
     if codepoint is None:
         return render_template("404.html"), 404
+    codepoint_id = codepoint.codepoint_id()
+    return conditional_response(
+        page_etag("c", codepoint_id),
+        lambda: render_cache.get_or_render(
+            unicode_info.data_version(), f"c/{codepoint_id:04X}", lambda: render_code(codepoint_id)
+        ),
+    )
+
+
+def render_code(codepoint_id: int) -> str:
+    return render_template("code.html", data=code_page_data(codepoint_id))
+
+
+def code_page_data(codepoint_id: int) -> typing.Dict[str, typing.Any]:
+    codepoint = unicode_info.get_codepoint(codepoint_id)
+    assert codepoint is not None
 
     combinables = []
     for combinable in codepoint.combinables:
@@ -99,9 +271,9 @@ def show_code(char_code: str) -> StrIntT:
         "next": unicode_info.get_codepoint_info(codepoint.next),
         "block": unicode_info.get_block_info(codepoint.block),
         "subblock": unicode_info.get_subblock(codepoint.subblock),
+        "unihan": unicode_info.get_unihan(codepoint.codepoint_id()),
     }
-
-    return render_template("code.html", data=info), 200
+    return info
 
 
 @flask_app.route("/code/<code>")
@@ -110,29 +282,114 @@ def show_code_old(code: str) -> Response:
 
 
 @flask_app.route("/b/<block_code>")
-@cache.memoize(120)
-def show_block(block_code: str) -> StrIntT:
+def show_block(block_code: str) -> typing.Union[StrIntT, Response]:
+    return show_block_page(block_code, 1)
+
+
+@flask_app.route("/b/<block_code>/<int:page>")
+def show_block_paged(block_code: str, page: int) -> typing.Union[StrIntT, Response]:
+    if page == 1:
+        return redirect(url_for("show_block", block_code=block_code))
+    return show_block_page(block_code, page)
+
+
+@flask_app.route("/b/<block_code>/all")
+def show_block_all(block_code: str) -> typing.Union[StrIntT, Response]:
+    # all characters of the block on a single page; the page is streamed instead of being cached
     block = unicode_info.get_block(hex2id(block_code.lower()))
     if not block:
         return render_template("404.html"), 404
+    wikipedia_summary = block_wikipedia_summary(block)
+    return conditional_response(
+        block_etag(block.block_id(), 0, wikipedia_summary),
+        lambda: stream_template("block.html", data=block_page_data(block.block_id(), wikipedia_summary, 0)),
+    )
+
+
+def show_block_page(block_code: str, page: int) -> typing.Union[StrIntT, Response]:
+    block = unicode_info.get_block(hex2id(block_code.lower()))
+    if not block or not 1 <= page <= block_page_count(block):
+        return render_template("404.html"), 404
+    wikipedia_summary = block_wikipedia_summary(block)
+    etag = block_etag(block.block_id(), page, wikipedia_summary)
+    return conditional_response(
+        etag,
+        lambda: render_cache.get_or_render(
+            unicode_info.data_version(), etag, lambda: render_block(block.block_id(), wikipedia_summary, page)
+        ),
+    )
+
+
+def block_wikipedia_summary(block: Block) -> str:
+    if not block.wikipedia:
+        return ""
+    return summaries.get(topic_from_url(block.wikipedia)) or ""
+
+
+def block_etag(block_id: int, page: int, wikipedia_summary: str) -> str:
+    # the summary may arrive after the first render, so it is part of the etag
+    return page_etag("b", block_id, f"-{page}-{zlib.crc32(wikipedia_summary.encode('utf-8')):08x}")
 
+
+def block_page_count(block: Block) -> int:
+    page_size = flask_app.config.get("BLOCK_PAGE_SIZE", BLOCK_PAGE_SIZE)
+    return max(1, -(-(block.to_codepoint() + 1 - block.from_codepoint()) // page_size))
+
+
+def render_block(block_id: int, wikipedia_summary: str, page: int) -> str:
+    return render_template("block.html", data=block_page_data(block_id, wikipedia_summary, page))
+
+
+def block_page_data(block_id: int, wikipedia_summary: str, page: int) -> typing.Dict[str, typing.Any]:
+    # page 0 is the whole block; its characters are generated while rendering
+    block = unicode_info.get_block(block_id)
+    assert block is not None
+
+    codes: typing.Sequence[int] = range(block.from_codepoint(), block.to_codepoint() + 1)
+    chars: typing.Iterable[CodepointInfo]
+    if page == 0:
+        chars = filter(None, map(unicode_info.get_codepoint_info, codes))
+    else:
+        page_size = flask_app.config.get("BLOCK_PAGE_SIZE", BLOCK_PAGE_SIZE)
+        codes = codes[(page - 1) * page_size : page * page_size]
+        chars = list(filter(None, [unicode_info.get_codepoint_info(codepoint) for codepoint in codes]))
     info = {
         "block": block,
-        "chars": list(
-            filter(None, [unicode_info.get_codepoint_info(codepoint) for codepoint in block.codepoints_iter()])
-        ),
+        "wikipedia_summary": wikipedia_summary,
+        "chars": chars,
+        "char_count": len(codes),
+        "page": page,
+        "pages": block_page_count(block),
         "prev": unicode_info.get_block_info(block.prev),
         "next": unicode_info.get_block_info(block.next),
     }
+    return info
+
 
-    return render_template("block.html", data=info), 200
+def page_etag(kind: str, code: int, suffix: str = "") -> str:
+    # the pages only change when other data is loaded
+    return f"{unicode_info.data_version()}-{kind}{code:04X}{suffix}"
+
+
+def conditional_response(
+    etag: str,
+    render: typing.Callable[[], typing.Union[bytes, typing.Iterator[str], typing.Iterator[bytes]]],
+    mimetype: typing.Optional[str] = None,
+) -> Response:
+    if request.if_none_match.contains(etag):
+        response = flask_app.response_class(status=304)
+    else:
+        response = flask_app.response_class(render(), mimetype=mimetype)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = flask_app.config.get("CACHE_CONTROL", "public, max-age=3600")
+    return response
 
 
 @flask_app.route("/block/<name>")
 def show_block_old(name: str) -> typing.Union[StrIntT, Response]:
     block_id = unicode_info.get_block_id_by_name(name)
     if block_id is not None:
-        return redirect(url_for("show_block", code=f"{block_id:04X}"))
+        return redirect(url_for("show_block", block_code=f"{block_id:04X}"))
     return render_template("404.html"), 404
 
 
@@ -147,3 +404,8 @@ def search() -> StrIntT:
 @flask_app.route("/search", methods=["GET"])
 def search_bad_method() -> Response:
     return redirect("/")
+
+
+# the other route groups register on flask_app when they are imported, so they have to come last
+# pylint: disable=wrong-import-position,unused-import,cyclic-import
+from unicode import api_routes, site_routes, version_routes
@@ -1,21 +1,59 @@
 #!/usr/bin/env python3
 
 import logging
+import os
+import signal
 
 import click
 
-from unicode.app import flask_app, configure
+from unicode.app import flask_app, build_snapshot, configure, start_reload
+from unicode.server import Server
+from unicode.static import render_static
 
 
-@click.command()
+@click.group(invoke_without_command=True)
 @click.option("-c", "--config", default="config.py", type=click.Path(exists=True))
 @click.option("-r", "--reset", is_flag=True)
 @click.option("-v", "--verbose", is_flag=True)
-def main(config: str, reset: bool, verbose: bool,) -> None:
+@click.pass_context
+def main(ctx: click.Context, config: str, reset: bool, verbose: bool,) -> None:
     if verbose:
         logging.basicConfig(level=logging.INFO)
-    configure(config, reset)
-    flask_app.run()
+    ctx.obj = {"config": config, "reset": reset}
+    if ctx.invoked_subcommand is None:
+        configure(config, reset)
+        signal.signal(signal.SIGHUP, lambda _signum, _frame: start_reload())
+        signal.signal(signal.SIGUSR1, lambda _signum, _frame: start_reload(True))
+        flask_app.run()
+
+
+@main.command("build-snapshot")
+@click.pass_context
+def build_snapshot_cmd(ctx: click.Context) -> None:
+    file_name = build_snapshot(ctx.obj["config"], ctx.obj["reset"])
+    click.echo(f"snapshot written to {file_name}")
+
+
+@main.command("render-static")
+@click.option("-o", "--out", required=True, type=click.Path(file_okay=False))
+@click.option("-w", "--workers", default=os.cpu_count() or 1, type=int)
+@click.option("-z", "--gzip", "compress", is_flag=True,)
+@click.pass_context
+def render_static_cmd(ctx: click.Context, out: str, workers: int, compress: bool) -> None:
+    configure(ctx.obj["config"], ctx.obj["reset"])
+    rendered, skipped = render_static(out, workers, compress)
+    click.echo(f"rendered {rendered} pages to {out}, {skipped} pages were up-to-date")
+
+
+@main.command("serve")
+@click.option("-h", "--host", default="127.0.0.1")
+@click.option("-p", "--port", default=5000, type=int)
+@click.option("-w", "--workers", default=os.cpu_count() or 1, type=int)
+@click.option("--report-interval", default=60.0, type=float, help="seconds between memory reports (0: never)")
+@click.pass_context
+def serve_cmd(ctx: click.Context, host: str, port: int, workers: int, report_interval: float) -> None:
+    configure(ctx.obj["config"], ctx.obj["reset"])
+    Server(host, port, workers, report_interval).run()
 
 
 if __name__ == "__main__":
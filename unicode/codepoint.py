@@ -1,10 +1,16 @@
 import re
 import typing
 
+if typing.TYPE_CHECKING:
+    from unicode.store import CodepointStore  # pylint: disable=cyclic-import
 
-def code_link(code: str) -> str:
+# a code mentioned in a text (e.g. a NamesList comment)
+RE_CODE_REFERENCE = re.compile(r"\b[0-9A-F]{4,6}\b")
+
+
+def code_link(code: str, url_prefix: str = "") -> str:
     code_upper = code.upper()
-    return f'<a href="/c/{code_upper}">U+{code_upper}</a>'
+    return f'<a href="{url_prefix}/c/{code_upper}">U+{code_upper}</a>'
 
 
 def hex2id(hex_string: str) -> typing.Optional[int]:
@@ -14,15 +20,17 @@ def hex2id(hex_string: str) -> typing.Optional[int]:
 
 
 class CodepointInfo:
-    def __init__(self, codepoint: int, name: str):
+    __slots__ = ("codepoint", "_store")
+
+    def __init__(self, store: "CodepointStore", codepoint: int):
         self.codepoint = codepoint
-        self._name = name
+        self._store = store
 
     def codepoint_id(self) -> int:
         return self.codepoint
 
     def url(self) -> str:
-        return f"/c/{self.codepoint_id():04X}"
+        return f"{self._store.url_prefix}/c/{self.codepoint_id():04X}"
 
     def u_plus(self) -> str:
         return f"U+{self.codepoint_id():04X}"
@@ -40,28 +48,70 @@ class CodepointInfo:
             return None
 
     def name(self) -> str:
-        return self._name
+        return self._store.name(self.codepoint)
 
     def set_name(self, name: str) -> None:
-        self._name = name
+        self._store.set_name(self.codepoint, name)
 
     def title(self) -> str:
-        return f"U+{self.codepoint_id():04X}: {self._name}"
+        return f"U+{self.codepoint_id():04X}: {self.name()}"
+
+
+def _optional(value: int) -> typing.Optional[int]:
+    return None if value < 0 else value
 
 
 class Codepoint:
-    def __init__(self, codepoint: int, name: str, block_id: int = None):
-        self.info = CodepointInfo(codepoint, name)
-        self.block: typing.Optional[int] = block_id
-        self.subblock: typing.Optional[int] = None
-        self.case: typing.Optional[int] = None
-        self.alternate: typing.List[str] = []
-        self.comments: typing.List[str] = []
-        self.related: typing.List[int] = []
-        self.confusables: typing.List[int] = []
-        self.combinables: typing.List[typing.List[int]] = []
-        self.prev: typing.Optional[int] = None
-        self.next: typing.Optional[int] = None
+    # a view into the CodepointStore; created on demand
+    __slots__ = ("info", "_store")
+
+    def __init__(self, store: "CodepointStore", codepoint: int):
+        self.info = CodepointInfo(store, codepoint)
+        self._store = store
+
+    @property
+    def block(self) -> typing.Optional[int]:
+        return _optional(self._store.block[self.info.codepoint])
+
+    @property
+    def subblock(self) -> typing.Optional[int]:
+        return _optional(self._store.subblock[self.info.codepoint])
+
+    @property
+    def case(self) -> typing.Optional[int]:
+        return _optional(self._store.case[self.info.codepoint])
+
+    @property
+    def prev(self) -> typing.Optional[int]:
+        return _optional(self._store.prev_code(self.info.codepoint))
+
+    @property
+    def next(self) -> typing.Optional[int]:
+        return _optional(self._store.next_code(self.info.codepoint))
+
+    @property
+    def alternate(self) -> typing.List[str]:
+        return self._store.get_strings(self._store.alternate, self.info.codepoint)
+
+    @property
+    def comments(self) -> typing.List[str]:
+        return self._store.get_strings(self._store.comments, self.info.codepoint)
+
+    @property
+    def linked_comments(self) -> typing.List[str]:
+        return [self._store.linked_comment(index) for index in self._store.comments.get(self.info.codepoint)]
+
+    @property
+    def related(self) -> typing.Sequence[int]:
+        return self._store.related.get(self.info.codepoint)
+
+    @property
+    def confusables(self) -> typing.List[int]:
+        return self._store.get_confusables(self.info.codepoint)
+
+    @property
+    def combinables(self) -> typing.List[typing.Tuple[int, ...]]:
+        return self._store.get_sequences(self.info.codepoint)
 
     def codepoint_id(self) -> int:
         return self.info.codepoint_id()
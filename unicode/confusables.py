@@ -0,0 +1,33 @@
+import typing
+import unicodedata
+
+
+class SkeletonTable:
+    # the UTS #39 confusable mappings (source codepoint -> prototype string) as a str.translate table:
+    # skeleton(s) = NFD(translate(NFD(s))), and two strings are confusable iff their skeletons are equal
+    def __init__(self, mappings: typing.Iterable[typing.Tuple[int, typing.Sequence[int]]] = ()) -> None:
+        self._table: typing.Dict[int, str] = {}
+        for source, targets in mappings:
+            self._table.setdefault(source, "".join(map(chr, targets)))
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def __contains__(self, code: int) -> bool:
+        return code in self._table
+
+    def prototype(self, code: int) -> typing.Optional[str]:
+        return self._table.get(code)
+
+    def skeleton(self, string: str) -> str:
+        # ascii strings are their own NFD, so most strings skip both normalizations
+        if not string.isascii():
+            string = unicodedata.normalize("NFD", string)
+        string = string.translate(self._table)
+        return string if string.isascii() else unicodedata.normalize("NFD", string)
+
+    def skeletons(self, strings: typing.Iterable[str]) -> typing.List[str]:
+        return list(map(self.skeleton, strings))
+
+    def is_confusable(self, string1: str, string2: str) -> bool:
+        return self.skeleton(string1) == self.skeleton(string2)
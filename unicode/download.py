@@ -1,12 +1,16 @@
+import concurrent.futures
+import hashlib
+import json
 import logging
 import os
 import pathlib
-import zipfile
+import tempfile
+import typing
 
 import requests
 import requests_ftp  # type: ignore
 
-from unicode.version import __user_agent__
+from unicode.version import __user_agent__, __version__
 
 requests_ftp.monkeypatch_session()
 
@@ -15,66 +19,196 @@ CASEFOLDING_TARGET = "CaseFolding.txt"
 CONFUSABLES_TARGET = "confusables.txt"
 HANGUL_TARGET = "hangul.txt"
 NAMESLIST_TARGET = "NamesList.txt"
-UNIHAN_READINGS_TARGET = "Unihan_Readings.txt"
 UNIHAN_TARGET = "Unihan.zip"
 WIKIPEDIA_TARGET = "wikipedia.html"
+MANIFEST_TARGET = "manifest.json"
 
 UNICODE = "13.0.0"
-BLOCKS_URL = f"ftp://www.unicode.org/Public/{UNICODE}/ucd/Blocks.txt"
-CASEFOLDING_URL = f"ftp://www.unicode.org/Public/{UNICODE}/ucd/CaseFolding.txt"
-CONFUSABLES_URL = f"ftp://ftp.unicode.org/Public/security/{UNICODE}/confusables.txt"
 HANGUL_URL = "https://raw.githubusercontent.com/whatwg/encoding/master/index-euc-kr.txt"
-NAMESLIST_URL = f"ftp://www.unicode.org/Public/{UNICODE}/ucd/NamesList.txt"
-UNIHAN_URL = f"ftp://www.unicode.org/Public/{UNICODE}/ucd/Unihan.zip"
 WIKIPEDIA_URL = "https://en.wikipedia.org/wiki/Unicode_block"
 
 
-def fetch_data_files(cache_dir: str, reset_cache: bool) -> None:
-    if reset_cache:
-        for file_name in [
-            BLOCKS_TARGET,
-            CASEFOLDING_TARGET,
-            CONFUSABLES_TARGET,
-            HANGUL_TARGET,
-            NAMESLIST_TARGET,
-            UNIHAN_READINGS_TARGET,
-            UNIHAN_TARGET,
-            WIKIPEDIA_TARGET,
-        ]:
-            path = os.path.join(cache_dir, file_name)
-            if os.path.isfile(path):
-                os.remove(path)
-    download(BLOCKS_URL, os.path.join(cache_dir, BLOCKS_TARGET))
-    download(CASEFOLDING_URL, os.path.join(cache_dir, CASEFOLDING_TARGET))
-    download(CONFUSABLES_URL, os.path.join(cache_dir, CONFUSABLES_TARGET))
-    download(HANGUL_URL, os.path.join(cache_dir, HANGUL_TARGET))
-    download(NAMESLIST_URL, os.path.join(cache_dir, NAMESLIST_TARGET))
-    download(UNIHAN_URL, os.path.join(cache_dir, UNIHAN_TARGET))
-    download(WIKIPEDIA_URL, os.path.join(cache_dir, WIKIPEDIA_TARGET))
-    unzip(os.path.join(cache_dir, UNIHAN_TARGET), cache_dir)
-
-
-def download(url: str, cache_file_name: str) -> None:
-    if os.path.isfile(cache_file_name):
-        return
+def sources(unicode_version: str) -> typing.List[typing.Tuple[str, str]]:
+    # (url, target file name) of all downloaded data files of a Unicode version
+    return [
+        (f"ftp://www.unicode.org/Public/{unicode_version}/ucd/Blocks.txt", BLOCKS_TARGET),
+        (f"ftp://www.unicode.org/Public/{unicode_version}/ucd/CaseFolding.txt", CASEFOLDING_TARGET),
+        (f"ftp://ftp.unicode.org/Public/security/{unicode_version}/confusables.txt", CONFUSABLES_TARGET),
+        (HANGUL_URL, HANGUL_TARGET),
+        (f"ftp://www.unicode.org/Public/{unicode_version}/ucd/NamesList.txt", NAMESLIST_TARGET),
+        (f"ftp://www.unicode.org/Public/{unicode_version}/ucd/Unihan.zip", UNIHAN_TARGET),
+        (WIKIPEDIA_URL, WIKIPEDIA_TARGET),
+    ]
+
+
+SOURCES = sources(UNICODE)
+
+# the downloaded (not derived) data files; a snapshot is only valid for exactly these files
+DATA_FILES = [target for _, target in SOURCES]
+
+DOWNLOAD_WORKERS = 4
+CHUNK_SIZE = 64 * 1024
+# seconds; a stalled server fails the download instead of blocking a reload forever
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 60
+
+Metadata = typing.Dict[str, typing.Any]
+
+
+def fetch_data_files(
+    cache_dir: str, reset_cache: bool, files: typing.Optional[typing.List[typing.Tuple[str, str]]] = None
+) -> None:
+    # Downloads missing or corrupt data files. With 'reset_cache', the existing files are revalidated
+    # against the servers (If-None-Match/If-Modified-Since for http), so only changed files are fetched.
+    if files is None:
+        files = SOURCES
+    pathlib.Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    manifest = read_manifest(cache_dir)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as executor:
+        futures = {
+            target: executor.submit(download, url, os.path.join(cache_dir, target), manifest.get(target), reset_cache)
+            for url, target in files
+        }
+        errors = []
+        for target, future in futures.items():
+            try:
+                manifest[target] = future.result()
+            except (OSError, RuntimeError, requests.RequestException) as error:
+                logging.error("failed to fetch %s: %s", target, error)
+                errors.append(error)
+    write_manifest(cache_dir, manifest)
+    if errors:
+        raise errors[0]
+
+
+def read_manifest(cache_dir: str) -> typing.Dict[str, Metadata]:
+    try:
+        with open(os.path.join(cache_dir, MANIFEST_TARGET), "r", encoding="utf-8") as manifest_file:
+            manifest = json.load(manifest_file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def write_manifest(cache_dir: str, manifest: typing.Dict[str, Metadata]) -> None:
+    file_name = os.path.join(cache_dir, MANIFEST_TARGET)
+    with open(f"{file_name}.tmp", "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+    os.replace(f"{file_name}.tmp", file_name)
+
+
+def data_version(cache_dir: str) -> str:
+    # content based, so all hosts serving the same data agree on it
+    digest = hashlib.sha256(__version__.encode("utf-8"))
+    for target, file_checksum in checksums(cache_dir, DATA_FILES).items():
+        digest.update(f"{target}:{file_checksum}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def checksums(cache_dir: str, targets: typing.Iterable[str]) -> typing.Dict[str, typing.Optional[str]]:
+    # the sha256 of the data files (None if missing): from the manifest, or computed again if a file was
+    # changed since it was verified (e.g. edited by hand)
+    manifest = read_manifest(cache_dir)
+    result: typing.Dict[str, typing.Optional[str]] = {}
+    for target in targets:
+        file_name = os.path.join(cache_dir, target)
+        try:
+            stat = os.stat(file_name)
+        except FileNotFoundError:
+            result[target] = None
+            continue
+        metadata = manifest.get(target, {})
+        unchanged = (metadata.get("size"), metadata.get("mtime_ns")) == (stat.st_size, stat.st_mtime_ns)
+        if unchanged and metadata.get("sha256"):
+            result[target] = metadata["sha256"]
+        else:
+            result[target] = checksum(file_name)
+    return result
+
+
+def is_valid(cache_file_name: str, metadata: typing.Optional[Metadata]) -> bool:
+    if metadata is None or not os.path.isfile(cache_file_name):
+        return False
+    if os.path.getsize(cache_file_name) != metadata.get("size"):
+        return False
+    return bool(checksum(cache_file_name) == metadata.get("sha256"))
+
+
+def checksum(file_name: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_name, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def download(url: str, cache_file_name: str, metadata: typing.Optional[Metadata], revalidate: bool) -> Metadata:
+    valid = is_valid(cache_file_name, metadata)
+    if metadata is not None and metadata.get("url") != url:
+        valid = False
+    if valid and not revalidate:
+        assert metadata is not None
+        return _stat(metadata, cache_file_name)
+    if metadata is not None and not valid and os.path.isfile(cache_file_name):
+        logging.warning("corrupt data file: %s", cache_file_name)
 
     logging.info("downloading: %s", url)
     if url.startswith("ftp:"):
+        # ftp has no conditional requests, so revalidating means downloading again
         ftp_session = requests.Session()
-        res = ftp_session.get(url)
+        # ftplib takes a single timeout for connecting and for every later socket operation
+        res = ftp_session.get(url, stream=True, timeout=READ_TIMEOUT)
     else:
-        res = requests.get(url, headers={"user-agent": __user_agent__})
+        headers = {"user-agent": __user_agent__}
+        if valid:
+            assert metadata is not None
+            if metadata.get("etag"):
+                headers["if-none-match"] = metadata["etag"]
+            if metadata.get("last_modified"):
+                headers["if-modified-since"] = metadata["last_modified"]
+        res = requests.get(url, headers=headers, stream=True, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+
+    with res:
+        if valid and res.status_code == requests.codes.not_modified:
+            logging.info("not modified: %s", url)
+            assert metadata is not None
+            return _stat(metadata, cache_file_name)
+        if res.status_code != requests.codes.ok:
+            raise RuntimeError(f"downloading {url} yields {res.status_code}")
+        return _store(url, res, cache_file_name)
 
-    if res.status_code == requests.codes.ok:
-        data = res.content
-    else:
-        raise RuntimeError(f"downloading {url} yields {res.status_code}")
 
-    pathlib.Path(os.path.dirname(cache_file_name)).mkdir(parents=True, exist_ok=True)
-    with open(cache_file_name, "wb") as f:
-        f.write(data)
+def _store(url: str, res: requests.Response, cache_file_name: str) -> Metadata:
+    # stream into a temporary file next to the target and rename it afterwards, so that an interrupted
+    # download never leaves a partial file under the target name
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_file_name = tempfile.mkstemp(dir=os.path.dirname(cache_file_name), prefix=".download-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in res.iter_content(CHUNK_SIZE):
+                f.write(chunk)
+                digest.update(chunk)
+                size += len(chunk)
+        expected_size = res.headers.get("content-length")
+        if expected_size is not None and not res.headers.get("content-encoding") and int(expected_size) != size:
+            raise RuntimeError(f"downloading {url} yields {size} of {expected_size} bytes")
+        os.chmod(tmp_file_name, 0o644)
+        os.replace(tmp_file_name, cache_file_name)
+    except BaseException:
+        if os.path.exists(tmp_file_name):
+            os.remove(tmp_file_name)
+        raise
+    metadata = {
+        "url": url,
+        "etag": res.headers.get("etag"),
+        "last_modified": res.headers.get("last-modified"),
+        "sha256": digest.hexdigest(),
+        "size": size,
+    }
+    return _stat(metadata, cache_file_name)
 
 
-def unzip(zip_file_name: str, target_dir: str) -> None:
-    with zipfile.ZipFile(zip_file_name, "r") as f:
-        f.extractall(target_dir)
+def _stat(metadata: Metadata, cache_file_name: str) -> Metadata:
+    # the mtime of the verified file, so that checksums() can tell whether it was changed since
+    return {**metadata, "mtime_ns": os.stat(cache_file_name).st_mtime_ns}
@@ -0,0 +1,65 @@
+import codecs
+import json
+import typing
+
+from unicode.store import NONE
+from unicode.uinfo import UInfo
+
+# name, block name and whether the codepoint has confusables
+Description = typing.Tuple[typing.Optional[str], typing.Optional[str], bool]
+
+CHUNK_SIZE = 64 * 1024
+
+
+def read_chunks(stream: typing.IO[bytes], chunk_size: int = CHUNK_SIZE) -> typing.Iterator[bytes]:
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def inspect_stream(uinfo: UInfo, chunks: typing.Iterable[bytes]) -> typing.Iterator[str]:
+    # Yields a json line (offset, code, name, block, confusable) for each character of the utf-8 encoded
+    # input. Only one chunk is held in memory at a time; each chunk's distinct characters are looked
+    # up together and their (constant) part of the json lines is built once.
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    fragments: typing.Dict[str, str] = {}
+    offset = 0
+    for chunk in chunks:
+        text = decoder.decode(chunk)
+        yield from _inspect_text(uinfo, text, offset, fragments)
+        offset += len(text)
+    yield from _inspect_text(uinfo, decoder.decode(b"", final=True), offset, fragments)
+
+
+def _inspect_text(uinfo: UInfo, text: str, offset: int, fragments: typing.Dict[str, str]) -> typing.Iterator[str]:
+    missing = {ord(char) for char in set(text) if char not in fragments}
+    for code, (name, block, confusable) in describe_codes(uinfo, missing).items():
+        fragments[chr(code)] = json.dumps(
+            {"code": f"{code:04X}", "name": name, "block": block, "confusable": confusable}
+        )[1:]
+    lines = [f'{{"offset": {offset + index}, {fragments[char]}\n' for index, char in enumerate(text)]
+    if lines:
+        yield "".join(lines)
+
+
+def describe_codes(uinfo: UInfo, codes: typing.Iterable[int]) -> typing.Dict[int, Description]:
+    # many codes at once, read from the columns of the store
+    codepoints = uinfo.codepoint_store()
+    skeletons = uinfo.skeleton_table()
+    block_names: typing.Dict[int, str] = {}
+    result: typing.Dict[int, Description] = {}
+    for code in codes:
+        if not codepoints.contains(code):
+            result[code] = (None, None, False)
+            continue
+        block_id = codepoints.block[code]
+        block_name = block_names.get(block_id)
+        if block_name is None:
+            block = uinfo.get_block(block_id)
+            assert block is not None
+            block_name = block_names[block_id] = block.name()
+        confusable = code in skeletons or codepoints.cluster[code] != NONE or bool(codepoints.combinables.get(code))
+        result[code] = (codepoints.name(code), block_name, confusable)
+    return result
@@ -0,0 +1,255 @@
+import io
+import logging
+import re
+import typing
+import zipfile
+
+from unicode.codepoint import hex2id
+
+# The parsers only turn the data files into plain records (codepoint ids, strings), so they do not need
+# the UInfo object graph and can run in worker processes. UInfo merges the records afterwards.
+
+UNIHAN_READINGS_MEMBER = "Unihan_Readings.txt"
+
+HEX_DIGITS = "0123456789ABCDEFabcdef"
+UPPER_HEX_DIGITS = "0123456789ABCDEF"
+
+BlockRecord = typing.Tuple[int, int, str]
+CodeNameRecord = typing.Tuple[int, str]
+CodePairRecord = typing.Tuple[int, int]
+
+
+class NamesListRecords(typing.NamedTuple):
+    blocks: typing.List[BlockRecord]
+    names: typing.List[CodeNameRecord]
+    alternates: typing.List[CodeNameRecord]
+    comments: typing.List[CodeNameRecord]
+    related: typing.List[CodePairRecord]
+    subblocks: typing.List[typing.Tuple[int, typing.Optional[int], str]]
+
+
+class ConfusablesRecords(typing.NamedTuple):
+    pairs: typing.List[CodePairRecord]
+    sequences: typing.List[typing.Tuple[int, typing.List[int]]]
+    # all source -> prototype (target sequence) mappings, in file order
+    mappings: typing.List[typing.Tuple[int, typing.List[int]]]
+
+
+def parse_blocks(file_name: str) -> typing.List[BlockRecord]:
+    blocks = []
+    with open(file_name, "r", encoding="utf-8") as blocks_file:
+        for line in blocks_file:
+            line = line.strip()
+            if line.startswith("#") or line == "":
+                continue
+            match = re.split(r"\.\.|;\s+", line)
+            if len(match) != 3:
+                continue
+            range_from = hex2id(match[0])
+            assert range_from is not None
+            range_to = hex2id(match[1])
+            assert range_to is not None
+            blocks.append((range_from, range_to, match[2]))
+    return blocks
+
+
+def _hex_code(token: str, digits: str = HEX_DIGITS, min_length: int = 4) -> int:
+    # the code of a hex token of min_length..6 digits, or -1
+    if min_length <= len(token) <= 6 and not token.strip(digits):
+        return int(token, 16)
+    return -1
+
+
+def _check_code(code: int, line: str) -> int:
+    if code > 0x10FFFF:
+        raise ValueError(f"invalid code in line: {line}")
+    return code
+
+
+def parse_nameslist(  # pylint: disable=too-many-locals
+    file_name: str, block_ends: typing.Dict[int, int]
+) -> NamesListRecords:
+    # A single pass over the lines; the kind of a line is determined by its first characters:
+    #   "1234\tNAME", "\t= alternate", "\t* comment", "\tx 1234" or "\tx (name - 1234)",
+    #   "@@\t1234\tblock name\t12FF" and "@\t\tsubblock name"
+    records = NamesListRecords([], [], [], [], [], [])
+    subblocks: typing.Dict[int, typing.List[typing.Any]] = {}
+    names_append = records.names.append
+    alternates_append = records.alternates.append
+    comments_append = records.comments.append
+    related_append = records.related.append
+    with open(file_name, encoding="utf-8") as nameslist_file:
+        codepoint_id: typing.Optional[int] = None
+        codepoint: typing.Optional[int] = None
+        subblock = None
+        blockend = None
+
+        for line in nameslist_file:
+            first = line[0]
+            if first == "\t":
+                marker = line[1:2]
+                if marker == "=":
+                    assert codepoint is not None
+                    alternates_append((codepoint, line[2:].strip()))
+                elif marker == "*":
+                    assert codepoint is not None
+                    comments_append((codepoint, line[2:].strip()))
+                elif marker == "x":
+                    text = line.rstrip("\n")
+                    if text.startswith("\tx (") and text.endswith(")"):
+                        separator = text.rfind(" - ")
+                        codepoint_id2 = _hex_code(text[separator + 3 : -1], UPPER_HEX_DIGITS) if separator >= 4 else -1
+                    else:
+                        codepoint_id2 = _hex_code(text[3:], UPPER_HEX_DIGITS) if text.startswith("\tx ") else -1
+                    if codepoint_id2 < 0:
+                        logging.info("strange related: %s", line)
+                        continue
+                    assert codepoint is not None
+                    related_append((codepoint, _check_code(codepoint_id2, line)))
+            elif first == "@":
+                if line.startswith("@@\t"):
+                    if subblock is not None:
+                        subblocks[subblock][1] = blockend
+                    subblock = None
+                    header = line[3:].rstrip("\n")
+                    first_tab = header.find("\t")
+                    last_tab = header.rfind("\t")
+                    block_id = _hex_code(header[:first_tab], UPPER_HEX_DIGITS)
+                    range_to = _hex_code(header[last_tab + 1 :], UPPER_HEX_DIGITS)
+                    if first_tab == last_tab or block_id < 0 or range_to < 0:
+                        logging.info("bad block header: %s", line)
+                        continue
+                    codepoint_id = block_id - 1
+                    if block_id in block_ends:
+                        blockend = block_ends[block_id]
+                    else:
+                        blockend = range_to
+                        block_name = header[first_tab + 1 : last_tab]
+                        logging.info("unknown block: %s-%s: %s", header[:first_tab], header[last_tab + 1 :], block_name)
+                        records.blocks.append((block_id, range_to, block_name))
+                elif line.startswith("@\t\t"):
+                    assert codepoint_id is not None
+                    if subblock is not None:
+                        subblocks[subblock][1] = codepoint_id
+                    subblock = codepoint_id + 1
+                    subblocks[subblock] = [subblock, None, line[3:].strip()]
+            else:
+                tab = line.find("\t")
+                if tab < 0:
+                    continue
+                code = _hex_code(line[:tab], UPPER_HEX_DIGITS)
+                if code < 0:
+                    continue
+                codepoint_id = codepoint = _check_code(code, line)
+                names_append((codepoint, line[tab + 1 :].split("\t", 1)[0].strip()))
+        if subblock is not None:
+            subblocks[subblock][1] = blockend
+    records.subblocks.extend((range_from, range_to, name) for range_from, range_to, name in subblocks.values())
+    return records
+
+
+def parse_confusables(file_name: str) -> ConfusablesRecords:
+    # "source ; target target ... ; MA # comment"; every MA line is a mapping, and a confusable pair (one
+    # target) or sequence (two to four targets) if all codes have four to six digits
+    records = ConfusablesRecords([], [], [])
+    with open(file_name, encoding="utf-8") as confusables_file:
+        for line in confusables_file:
+            line = line.strip()
+            if line == "" or line[0] == "#":
+                continue
+            fields = line.split(";", 3)
+            if len(fields) < 3:
+                continue
+            source_token = fields[0].strip()
+            target_tokens = fields[1].split()
+            source = _hex_code(source_token, HEX_DIGITS, 1)
+            targets = [_hex_code(token, HEX_DIGITS, 1) for token in target_tokens]
+            if source < 0 or not targets or min(targets) < 0:
+                continue
+            if fields[2].split("#", 1)[0].strip() == "MA":
+                records.mappings.append((source, targets))
+            if (
+                not fields[2].lstrip().startswith("MA")
+                or len(targets) > 4
+                or min(len(source_token), *map(len, target_tokens)) < 4
+            ):
+                continue
+            if len(targets) == 1:
+                records.pairs.append((source, targets[0]))
+            else:
+                records.sequences.append((source, [target for target in targets if target]))
+    return records
+
+
+def parse_casefolding(file_name: str) -> typing.List[CodePairRecord]:
+    pairs = []
+    with open(file_name, encoding="utf-8") as casefolding_file:
+        re_case = re.compile(r"^\s*([0-9A-Fa-f]{4,6}); C; ([0-9A-Fa-f]{4,6}); #")
+        for line in casefolding_file:
+            line = line.strip()
+            if line.startswith("#") or line == "":
+                continue
+            match = re_case.match(line)
+            if match:
+                codepoint_id1 = hex2id(match.group(1))
+                codepoint_id2 = hex2id(match.group(2))
+                assert codepoint_id1 is not None
+                assert codepoint_id2 is not None
+                pairs.append((codepoint_id1, codepoint_id2))
+    return pairs
+
+
+def open_zip_member(zip_file_name: str, member: str) -> typing.Iterator[str]:
+    # streams the lines of a zip member without extracting it to disk
+    with zipfile.ZipFile(zip_file_name, "r") as archive:
+        with archive.open(member, "r") as member_file:
+            yield from io.TextIOWrapper(member_file, encoding="utf-8")
+
+
+def parse_unihan(zip_file_name: str) -> typing.List[CodeNameRecord]:
+    definitions = []
+    re_definition = re.compile(r"^U\+([0-9A-Fa-f]{4,6})\tkDefinition\t(.*)$")
+    for line in open_zip_member(zip_file_name, UNIHAN_READINGS_MEMBER):
+        line = line.strip()
+        match = re_definition.match(line)
+        if match:
+            codepoint_id = hex2id(match.group(1))
+            assert codepoint_id is not None
+            definitions.append((codepoint_id, match.group(2)))
+    return definitions
+
+
+def parse_hangul(file_name: str) -> typing.List[CodeNameRecord]:
+    names = []
+    with open(file_name, "r", encoding="utf-8") as hangul_file:
+        #   423	0xAE28	긨 (HANGUL SYLLABLE GYISS)
+        re_definition = re.compile(r"^\s*[0-9]+\s*0x([0-9A-Fa-f]{4,6})\s+.*\((.+)\)\s*$")
+        for line in hangul_file:
+            line = line.strip()
+            match = re_definition.match(line)
+            if match is None:
+                continue
+            codepoint_id = hex2id(match.group(1))
+            assert codepoint_id is not None
+            names.append((codepoint_id, match.group(2)))
+    return names
+
+
+def parse_wikipedia(file_name: str) -> typing.List[CodeNameRecord]:
+    urls = []
+    with open(file_name, encoding="utf-8") as wikipedia_file:
+        rx1 = re.compile(r'^<td data-sort-value=".*">U\+([0-9A-Fa-f]{4,6})\.\.U\+([0-9A-Fa-f]{4,6})</td>')
+        rx2 = re.compile(r'^<td><a href="([^"]*)".*title="([^"]*)">')
+        range_from = None
+        for line in wikipedia_file:
+            line = line.strip()
+            if range_from is None:
+                match = rx1.match(line)
+                if match:
+                    range_from = hex2id(match.group(1))
+            else:
+                match = rx2.match(line)
+                if match:
+                    urls.append((range_from, f"https://en.wikipedia.org{match.group(1)}"))
+                range_from = None
+    return urls
@@ -0,0 +1,220 @@
+import collections
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import typing
+
+STATS_INTERVAL = 1000
+# when the directory is over its budget, the oldest pages are removed until it is at this fraction of it
+DIRECTORY_PRUNE_RATIO = 0.75
+
+
+class RenderCache:  # pylint: disable=too-many-instance-attributes
+    # Rendered pages, keyed by (data version, key). Pages never expire while their data version is
+    # served; memory is bounded by 'max_bytes' (least recently used pages are evicted first). With a
+    # 'directory' (ideally on a tmpfs like /dev/shm), pages are also shared between worker processes; the
+    # directory is bounded by 'max_directory_bytes' (the oldest pages are removed first).
+    def __init__(
+        self,
+        max_bytes: int = 64 * 2**20,
+        directory: typing.Optional[str] = None,
+        max_directory_bytes: int = 256 * 2**20,
+    ) -> None:
+        self._max_bytes = max_bytes
+        self._directory = directory
+        self._max_directory_bytes = max_directory_bytes
+        # the size of the directory as of the last scan, plus the pages this process wrote since then
+        self._directory_size = 0
+        self._prune_lock = threading.Lock()
+        # the data versions that are served (None: all); pages of other versions are not stored
+        self._versions: typing.Optional[typing.FrozenSet[str]] = None
+        self._pages: "collections.OrderedDict[typing.Tuple[str, str], bytes]" = collections.OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.file_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.file_evictions = 0
+
+    def configure(self, max_bytes: int, directory: typing.Optional[str], max_directory_bytes: int) -> None:
+        with self._lock:
+            self._max_bytes = max_bytes
+            self._directory = directory
+            self._max_directory_bytes = max_directory_bytes
+            self._evict()
+        self._prune_directory()
+
+    def stats(self) -> typing.Dict[str, int]:
+        with self._lock:
+            return {
+                "pages": len(self._pages),
+                "bytes": self._size,
+                "hits": self.hits,
+                "file_hits": self.file_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "file_bytes": self._directory_size,
+                "file_evictions": self.file_evictions,
+            }
+
+    def get_or_render(self, version: str, key: str, render: typing.Callable[[], str]) -> bytes:
+        with self._lock:
+            page = self._pages.get((version, key))
+            if page is not None:
+                self._pages.move_to_end((version, key))
+                self.hits += 1
+                self._log_stats()
+                return page
+        page = self._read_file(version, key)
+        if page is not None:
+            with self._lock:
+                self.file_hits += 1
+        else:
+            page = render().encode("utf-8")
+            # a request that started before a version swap may still render a page of a dropped version
+            if self._serves(version):
+                self._write_file(version, key, page)
+            with self._lock:
+                self.misses += 1
+        with self._lock:
+            if self._serves(version):
+                self._store(version, key, page)
+            self._log_stats()
+        return page
+
+    def drop_other_versions(self, *versions: str) -> None:
+        with self._lock:
+            self._versions = frozenset(versions)
+            for page_key in [page_key for page_key in self._pages if page_key[0] not in versions]:
+                self._size -= len(self._pages.pop(page_key))
+        if self._directory is None or not os.path.isdir(self._directory):
+            return
+        for entry in os.listdir(self._directory):
+            if entry not in versions:
+                shutil.rmtree(os.path.join(self._directory, entry), ignore_errors=True)
+        self._prune_directory()
+
+    def _serves(self, version: str) -> bool:
+        return self._versions is None or version in self._versions
+
+    def _store(self, version: str, key: str, page: bytes) -> None:
+        # requires self._lock
+        if len(page) > self._max_bytes:
+            return
+        old_page = self._pages.pop((version, key), None)
+        if old_page is not None:
+            self._size -= len(old_page)
+        self._pages[(version, key)] = page
+        self._size += len(page)
+        self._evict()
+
+    def _evict(self) -> None:
+        # requires self._lock
+        while self._size > self._max_bytes and self._pages:
+            _, page = self._pages.popitem(last=False)
+            self._size -= len(page)
+            self.evictions += 1
+
+    def _log_stats(self) -> None:
+        # requires self._lock
+        lookups = self.hits + self.file_hits + self.misses
+        if lookups % STATS_INTERVAL == 0:
+            logging.info(
+                "render cache: %d pages, %.1f MiB, %d hits, %d file hits, %d misses, %d evictions,"
+                " %.1f MiB of files, %d file evictions",
+                len(self._pages),
+                self._size / 2**20,
+                self.hits,
+                self.file_hits,
+                self.misses,
+                self.evictions,
+                self._directory_size / 2**20,
+                self.file_evictions,
+            )
+
+    def _file_name(self, version: str, key: str) -> typing.Optional[str]:
+        if self._directory is None:
+            return None
+        return os.path.join(self._directory, version, hashlib.sha256(key.encode("utf-8")).hexdigest())
+
+    def _read_file(self, version: str, key: str) -> typing.Optional[bytes]:
+        file_name = self._file_name(version, key)
+        if file_name is None:
+            return None
+        try:
+            with open(file_name, "rb") as page_file:
+                return page_file.read()
+        except OSError:
+            return None
+
+    def _write_file(self, version: str, key: str, page: bytes) -> None:
+        file_name = self._file_name(version, key)
+        if file_name is None:
+            return
+        # written under a process specific name and renamed, so other processes never see partial pages
+        tmp_file_name = f"{file_name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(file_name), exist_ok=True)
+            with open(tmp_file_name, "wb") as page_file:
+                page_file.write(page)
+            os.replace(tmp_file_name, file_name)
+        except OSError as error:
+            logging.warning("failed to write render cache file %s: %s", file_name, error)
+            return
+        with self._lock:
+            self._directory_size += len(page)
+            over_budget = self._directory_size > self._max_directory_bytes
+        if over_budget:
+            self._prune_directory()
+
+    def _prune_directory(self) -> None:
+        # Other processes write to the same directory, so its size is determined by a scan; the oldest pages
+        # (by modification time) are removed until it is well below the budget, which keeps scans rare.
+        if self._directory is None:
+            return
+        if not self._prune_lock.acquire(blocking=False):  # pylint: disable=consider-using-with
+            # another thread is pruning already
+            return
+        try:
+            files = []
+            for version_entry in _scandir(self._directory):
+                if version_entry.is_dir(follow_symlinks=False):
+                    for entry in _scandir(version_entry.path):
+                        if entry.name.endswith(".tmp"):
+                            # still being written
+                            continue
+                        try:
+                            stat = entry.stat(follow_symlinks=False)
+                        except OSError:
+                            continue
+                        files.append((stat.st_mtime_ns, stat.st_size, entry.path))
+            size = sum(file_size for _, file_size, _ in files)
+            evictions = 0
+            if size > self._max_directory_bytes:
+                files.sort()
+                for _, file_size, path in files:
+                    if size <= self._max_directory_bytes * DIRECTORY_PRUNE_RATIO:
+                        break
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        # removed by another process in the meantime
+                        pass
+                    size -= file_size
+                    evictions += 1
+            with self._lock:
+                self._directory_size = size
+                self.file_evictions += evictions
+        finally:
+            self._prune_lock.release()
+
+
+def _scandir(path: str) -> typing.List["os.DirEntry[str]"]:
+    try:
+        with os.scandir(path) as entries:
+            return list(entries)
+    except OSError:
+        return []
@@ -0,0 +1,104 @@
+import array
+import heapq
+import sys
+import typing
+
+TRIGRAM = 3
+
+
+def _trigrams(word: str) -> typing.Set[str]:
+    return {word[i : i + TRIGRAM] for i in range(len(word) - TRIGRAM + 1)}
+
+
+class NameIndex:
+    # inverted index from the (upper-cased, whitespace separated) words of codepoint names to codepoints.
+    # since search keywords never contain whitespace, a keyword is a substring of a name iff it is a
+    # substring of one of the name's words.
+    def __init__(self, entries: typing.Iterable[typing.Tuple[int, str]]) -> None:
+        postings: typing.Dict[str, typing.List[int]] = {}
+        self._codes: "array.array[int]" = array.array("i")
+        for code, name in entries:
+            self._codes.append(code)
+            for word in set(name.split()):
+                postings.setdefault(word, []).append(code)
+
+        self._words = sorted(postings)
+        self._offsets: "array.array[int]" = array.array("I", [0])
+        self._values: "array.array[int]" = array.array("i")
+        for word in self._words:
+            self._values.extend(postings[word])
+            self._offsets.append(len(self._values))
+
+        # trigram index over the words, so that keywords (which may be fragments of words) only need to
+        # be compared with the words sharing all of their trigrams
+        trigram_postings: typing.Dict[str, typing.List[int]] = {}
+        for word_index, word in enumerate(self._words):
+            for trigram in _trigrams(word):
+                trigram_postings.setdefault(trigram, []).append(word_index)
+        self._trigrams: typing.Dict[str, int] = {}
+        self._trigram_offsets: "array.array[int]" = array.array("I", [0])
+        self._trigram_values: "array.array[int]" = array.array("i")
+        for trigram, word_indexes in trigram_postings.items():
+            self._trigrams[trigram] = len(self._trigrams)
+            self._trigram_values.extend(word_indexes)
+            self._trigram_offsets.append(len(self._trigram_values))
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def word_count(self) -> int:
+        return len(self._words)
+
+    def posting_count(self) -> int:
+        return len(self._values)
+
+    def trigram_count(self) -> int:
+        return len(self._trigrams)
+
+    def size_bytes(self) -> int:
+        # the arrays, the word list with its strings and the trigram dict with its keys and values
+        arrays = [self._codes, self._offsets, self._values, self._trigram_offsets, self._trigram_values]
+        size = sum(sys.getsizeof(column) for column in arrays)
+        size += sys.getsizeof(self._words) + sum(sys.getsizeof(word) for word in self._words)
+        size += sys.getsizeof(self._trigrams)
+        size += sum(sys.getsizeof(trigram) + sys.getsizeof(index) for trigram, index in self._trigrams.items())
+        return size
+
+    def _matching_words(self, keyword: str) -> typing.Iterable[int]:
+        if len(keyword) < TRIGRAM:
+            return [index for index, word in enumerate(self._words) if keyword in word]
+        postings = []
+        for trigram in _trigrams(keyword):
+            trigram_index = self._trigrams.get(trigram)
+            if trigram_index is None:
+                return []
+            postings.append(
+                self._trigram_values[self._trigram_offsets[trigram_index] : self._trigram_offsets[trigram_index + 1]]
+            )
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return []
+        # sharing all trigrams is necessary, but not sufficient for containing the keyword
+        return [index for index in candidates if keyword in self._words[index]]
+
+    def _posting(self, word_index: int) -> "array.array[int]":
+        return self._values[self._offsets[word_index] : self._offsets[word_index + 1]]
+
+    def search(self, keywords: typing.List[str], count: int) -> typing.List[int]:
+        # returns the 'count' smallest codepoints whose names contain all keywords
+        if not keywords:
+            return list(self._codes[:count])
+        result: typing.Optional[typing.Set[int]] = None
+        # long keywords match fewer words, so they shrink the result set early
+        for keyword in sorted(set(keywords), key=len, reverse=True):
+            codes: typing.Set[int] = set()
+            for word_index in self._matching_words(keyword):
+                codes.update(self._posting(word_index))
+            result = codes if result is None else result & codes
+            if not result:
+                return []
+        assert result is not None
+        return heapq.nsmallest(count, result)
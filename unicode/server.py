@@ -0,0 +1,238 @@
+import gc
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+import typing
+
+from werkzeug.serving import ThreadedWSGIServer
+
+from unicode import app
+from unicode.versions import VersionSet
+
+# seconds between two checks of the workers
+SUPERVISE_INTERVAL = 1.0
+# a worker that exits sooner after its start is restarted with a delay, to avoid a restart loop
+MIN_WORKER_LIFETIME = 5.0
+
+
+class MemoryUsage(typing.NamedTuple):
+    # in bytes; 'pss' counts pages shared with n processes as 1/n
+    rss: int
+    pss: int
+    shared: int
+
+
+class Server:  # pylint: disable=too-many-instance-attributes
+    # Pre-forking server: the data is loaded once (by app.configure) in the supervising process, moved out
+    # of the garbage collector's reach with gc.freeze, and inherited by 'workers' forked processes. The
+    # workers share these pages copy-on-write and accept connections from one shared listening socket.
+    # On SIGHUP (or a reload request to any worker) the supervisor loads the new data in a thread, starts a
+    # new set of workers when it is loaded and lets the old ones finish their requests. SIGUSR1 does the same
+    # after revalidating the data files.
+    def __init__(self, host: str, port: int, workers: int, report_interval: float = 60.0) -> None:
+        self._host = host
+        self._port = port
+        self._workers = max(1, workers)
+        self._report_interval = report_interval
+        self._pids: typing.Dict[int, float] = {}
+        # old workers that finish their requests after a reload
+        self._retiring: typing.Set[int] = set()
+        self._stopping = False
+        # None: no reload requested, else whether to revalidate the data files
+        self._reload_request: typing.Optional[bool] = None
+        self._reload_thread: typing.Optional[threading.Thread] = None
+        self._reloaded: typing.Optional[VersionSet] = None
+        self._spawn_time = 0.0
+        self._socket: typing.Optional[socket.socket] = None
+
+    def run(self) -> None:
+        # pending prefetches must finish before forking: a fetch thread could hold a lock at fork time
+        app.summaries.wait()
+        self._socket = socket.create_server((self._host, self._port), backlog=128)
+        self._socket.set_inheritable(True)
+        # the gc would otherwise touch (and thereby copy) the loaded objects in every worker
+        gc.collect()
+        gc.freeze()
+        logging.info("serving on http://%s:%d with %d workers", self._host, self._port, self._workers)
+
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        signal.signal(signal.SIGHUP, self._reload)
+        signal.signal(signal.SIGUSR1, self._reload)
+        last_report = time.time()
+        try:
+            while not self._stopping:
+                self._reap()
+                self._check_reload()
+                while len(self._pids) < self._workers and not self._stopping and time.time() >= self._spawn_time:
+                    self._spawn()
+                if 0 < self._report_interval <= time.time() - last_report:
+                    self.report()
+                    last_report = time.time()
+                time.sleep(SUPERVISE_INTERVAL)
+        finally:
+            self._shutdown()
+
+    def report(self) -> None:
+        for pid in sorted(self._pids):
+            usage = memory_usage(pid)
+            if usage is None:
+                continue
+            logging.info(
+                "worker %d: rss %.1f MiB, pss %.1f MiB, shared %.1f MiB",
+                pid,
+                usage.rss / 2**20,
+                usage.pss / 2**20,
+                usage.shared / 2**20,
+            )
+
+    def worker_pids(self) -> typing.List[int]:
+        return sorted(self._pids)
+
+    def _check_reload(self) -> None:
+        # the data is loaded in a thread, so that this loop keeps replacing crashed workers meanwhile
+        if self._reload_thread is not None:
+            if self._reload_thread.is_alive():
+                return
+            self._reload_thread = None
+            if self._reloaded is not None:
+                self._replace_workers(self._reloaded)
+                self._reloaded = None
+        if self._reload_request is not None:
+            revalidate = self._reload_request
+            self._reload_request = None
+            self._reload_thread = threading.Thread(target=self._load, args=(revalidate,), name="reload", daemon=True)
+            self._reload_thread.start()
+
+    def _load(self, revalidate: bool) -> None:
+        try:
+            self._reloaded = app.load_data(revalidate)
+        except Exception:  # pylint: disable=broad-except
+            logging.exception("reload failed, still serving %s", app.active_versions.primary().data_version())
+
+    def _replace_workers(self, versions: VersionSet) -> None:
+        logging.info(
+            "reloaded data: %s -> %s", app.active_versions.primary().data_version(), versions.primary().data_version()
+        )
+        app.activate_versions(versions)
+        app.summaries.wait()
+        # the old data is only referenced by the old workers now; the new data is frozen instead
+        gc.unfreeze()
+        gc.collect()
+        gc.freeze()
+        old_pids = list(self._pids)
+        self._retiring.update(old_pids)
+        self._pids.clear()
+        for _ in range(self._workers):
+            self._spawn()
+        for pid in old_pids:
+            self._signal(pid, signal.SIGTERM)
+
+    def _spawn(self) -> None:
+        assert self._socket is not None
+        pid = os.fork()
+        if pid == 0:
+            self._serve()
+        self._pids[pid] = time.time()
+        logging.info("started worker %d", pid)
+
+    def _serve(self) -> None:
+        # runs in the forked worker and never returns
+        status = 0
+        try:
+            signal.signal(signal.SIGHUP, signal.SIG_DFL)
+            # the supervisor stops the workers (e.g. on ctrl-c, which is sent to the whole process group)
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            app.reload_trigger = self._trigger_reload
+            assert self._socket is not None
+            server = ThreadedWSGIServer(self._host, self._port, app.flask_app, fd=self._socket.fileno())
+            # on SIGTERM, stop accepting connections and let the running requests finish
+            server.daemon_threads = False
+            signal.signal(signal.SIGTERM, lambda _signum, _frame: threading.Thread(target=server.shutdown).start())
+            server.serve_forever()
+            server.server_close()
+        except Exception:  # pylint: disable=broad-except
+            logging.exception("worker %d failed", os.getpid())
+            status = 1
+        finally:
+            os._exit(status)  # pylint: disable=protected-access
+
+    def _reap(self) -> None:
+        while self._pids:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self._pids.clear()
+                return
+            if pid == 0:
+                return
+            if pid in self._retiring:
+                self._retiring.discard(pid)
+                logging.info("retired worker %d", pid)
+                continue
+            start_time = self._pids.pop(pid, None)
+            if start_time is None:
+                continue
+            logging.warning("worker %d exited with status %d", pid, os.waitstatus_to_exitcode(status))
+            if time.time() - start_time < MIN_WORKER_LIFETIME:
+                self._spawn_time = time.time() + MIN_WORKER_LIFETIME
+
+    def _stop(self, signum: int, _frame: typing.Any) -> None:
+        logging.info("received signal %d, stopping", signum)
+        self._stopping = True
+
+    def _reload(self, signum: int, _frame: typing.Any) -> None:
+        revalidate = signum == signal.SIGUSR1
+        logging.info("reload requested%s", " (revalidating the data files)" if revalidate else "")
+        # a request during a reload is done after it
+        self._reload_request = bool(self._reload_request) or revalidate
+
+    @staticmethod
+    def _trigger_reload(revalidate: bool) -> bool:
+        # runs in a worker: the supervisor does the reload
+        os.kill(os.getppid(), signal.SIGUSR1 if revalidate else signal.SIGHUP)
+        return True
+
+    @staticmethod
+    def _signal(pid: int, signum: int) -> None:
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+    def _shutdown(self) -> None:
+        pids = list(self._pids) + list(self._retiring)
+        for pid in pids:
+            self._signal(pid, signal.SIGTERM)
+        for pid in pids:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        self._pids.clear()
+        self._retiring.clear()
+        if self._socket is not None:
+            self._socket.close()
+
+
+def memory_usage(pid: int) -> typing.Optional[MemoryUsage]:
+    # from /proc/<pid>/smaps_rollup (linux >= 4.14)
+    values: typing.Dict[str, int] = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r", encoding="utf-8") as smaps_file:
+            for line in smaps_file:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == "kB":
+                    values[parts[0].rstrip(":")] = int(parts[1]) * 1024
+    except OSError:
+        return None
+    if "Rss" not in values:
+        return None
+    return MemoryUsage(
+        values["Rss"],
+        values.get("Pss", values["Rss"]),
+        values.get("Shared_Clean", 0) + values.get("Shared_Dirty", 0),
+    )
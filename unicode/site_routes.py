@@ -0,0 +1,91 @@
+import hmac
+import typing
+
+from flask import jsonify, render_template, request
+from werkzeug.wrappers import Response
+
+from unicode import app
+from unicode.sitemap import Sitemap, gzip_stream
+
+# by data version; only the active one is kept
+sitemaps: typing.Dict[str, Sitemap] = {}
+
+
+@app.flask_app.route("/sitemap.txt")
+def sitemap() -> app.BytesIntT:
+    return (
+        app.render_cache.get_or_render(
+            app.unicode_info.data_version(),
+            "sitemap.txt",
+            lambda: render_template("sitemap.txt", blocks=app.unicode_info.get_block_infos()),
+        ),
+        200,
+    )
+
+
+@app.flask_app.route("/sitemap.xml")
+@app.flask_app.route("/sitemap.xml.gz")
+def sitemap_index() -> Response:
+    compress = request.path.endswith(".gz")
+    extension = ".xml.gz" if compress else ".xml"
+    pieces = current_sitemap().index(lambda shard: f"/sitemaps/{shard}{extension}")
+    return sitemap_response(app.page_etag("sitemap", 0, extension), pieces, compress)
+
+
+@app.flask_app.route("/sitemaps/<int:shard>.xml")
+@app.flask_app.route("/sitemaps/<int:shard>.xml.gz")
+def sitemap_shard(shard: int) -> typing.Union[app.StrIntT, Response]:
+    shards = current_sitemap()
+    if shard >= shards.shard_count():
+        return render_template("404.html"), 404
+    compress = request.path.endswith(".gz")
+    etag = app.page_etag("sitemap", shard + 1, ".xml.gz" if compress else ".xml")
+    return sitemap_response(etag, shards.shard(shard), compress)
+
+
+def sitemap_response(etag: str, pieces: typing.Iterator[str], compress: bool) -> Response:
+    if compress:
+        return app.conditional_response(etag, lambda: gzip_stream(pieces), "application/gzip")
+    return app.conditional_response(etag, lambda: pieces, "application/xml")
+
+
+def current_sitemap() -> Sitemap:
+    # built once per data version from the block list and the assigned codepoints
+    version = app.unicode_info.data_version()
+    site_map = sitemaps.get(version)
+    if site_map is None:
+        block_paths = []
+        for block_info in app.unicode_info.get_block_infos():
+            block = app.unicode_info.get_block(block_info.block_id())
+            assert block is not None
+            block_paths.append(block.url())
+            block_paths.extend(f"{block.url()}/{page}" for page in range(2, app.block_page_count(block) + 1))
+        site_map = Sitemap(
+            app.flask_app.config.get("BASE_URL", ""), block_paths, app.unicode_info.get_assigned_codepoints()
+        )
+        sitemaps.clear()
+        sitemaps[version] = site_map
+    return site_map
+
+
+@app.flask_app.route("/robots.txt")
+def robots() -> app.BytesIntT:
+    return (
+        app.render_cache.get_or_render(
+            app.unicode_info.data_version(), "robots.txt", lambda: render_template("robots.txt")
+        ),
+        200,
+    )
+
+
+@app.flask_app.route("/admin/reload", methods=["POST"])
+def admin_reload() -> typing.Union[app.StrIntT, typing.Tuple[Response, int]]:
+    token = app.flask_app.config.get("RELOAD_TOKEN")
+    if not token:
+        return render_template("404.html"), 404
+    authorization = request.headers.get("Authorization", "").encode("utf-8")
+    if not hmac.compare_digest(authorization, f"Bearer {token}".encode("utf-8")):
+        return jsonify({"error": "invalid token"}), 403
+    # ?revalidate=1 also fetches changed data files; by default the data is reloaded from the cache dir
+    started = app.reload_trigger(request.values.get("revalidate", "") not in ("", "0"))
+    return jsonify({"reloading": started, "data_version": app.unicode_info.data_version()}), 202 if started else 409
@@ -0,0 +1,64 @@
+import typing
+import zlib
+from xml.sax.saxutils import escape
+
+# maximum number of URLs per sitemap (sitemaps.org protocol)
+SHARD_SIZE = 50000
+# URLs per yielded piece of a shard
+PIECE_SIZE = 1000
+
+
+class Sitemap:
+    # The URLs of all block pages and assigned codepoint pages, split into shards of at most
+    # 'shard_size' URLs. Only the (few) block paths and the codepoints are stored; the URLs of a shard
+    # are generated while it is streamed.
+    def __init__(
+        self,
+        base_url: str,
+        block_paths: typing.List[str],
+        codes: typing.Sequence[int],
+        shard_size: int = SHARD_SIZE,
+    ) -> None:
+        self._base_url = escape(base_url)
+        self._block_paths = block_paths
+        self._codes = codes
+        self._shard_size = shard_size
+
+    def __len__(self) -> int:
+        return len(self._block_paths) + len(self._codes)
+
+    def shard_count(self) -> int:
+        return max(1, -(-len(self) // self._shard_size))
+
+    def index(self, shard_path: typing.Callable[[int], str]) -> typing.Iterator[str]:
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+        yield '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        for shard in range(self.shard_count()):
+            yield f"<sitemap><loc>{self._base_url}{escape(shard_path(shard))}</loc></sitemap>\n"
+        yield "</sitemapindex>\n"
+
+    def shard(self, shard: int) -> typing.Iterator[str]:
+        first = shard * self._shard_size
+        last = min(first + self._shard_size, len(self))
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+        yield '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        for piece_first in range(first, last, PIECE_SIZE):
+            yield "".join(
+                f"<url><loc>{self._base_url}{self._path(position)}</loc></url>\n"
+                for position in range(piece_first, min(piece_first + PIECE_SIZE, last))
+            )
+        yield "</urlset>\n"
+
+    def _path(self, position: int) -> str:
+        if position < len(self._block_paths):
+            return self._block_paths[position]
+        return f"/c/{self._codes[position - len(self._block_paths)]:04X}"
+
+
+def gzip_stream(pieces: typing.Iterable[str]) -> typing.Iterator[bytes]:
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for piece in pieces:
+        data = compressor.compress(piece.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,65 @@
+import gc
+import hashlib
+import logging
+import mmap
+import os
+import pickle
+import struct
+import typing
+
+from unicode.version import __version__
+
+SNAPSHOT_MAGIC = b"UNICODE-SNAPSHOT"
+SNAPSHOT_FORMAT = 17
+
+# magic, format version, sha256 fingerprint of the source files
+_HEADER = struct.Struct("<16sI32s")
+
+
+def fingerprint(checksums: typing.Dict[str, typing.Optional[str]]) -> bytes:
+    # keyed on the contents of the source files, not their mtimes: downloading unchanged files again keeps
+    # the snapshot valid
+    digest = hashlib.sha256()
+    digest.update(f"{__version__}:{SNAPSHOT_FORMAT}".encode("utf-8"))
+    for file_name, file_checksum in checksums.items():
+        digest.update(f"{file_name}:{file_checksum or 'missing'}".encode("utf-8"))
+    return digest.digest()
+
+
+def write(file_name: str, source_fingerprint: bytes, state: typing.Any) -> None:
+    tmp_file_name = f"{file_name}.tmp"
+    with open(tmp_file_name, "wb") as snapshot_file:
+        snapshot_file.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT, source_fingerprint))
+        pickle.dump(state, snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_file_name, file_name)
+
+
+def read(file_name: str, source_fingerprint: bytes) -> typing.Optional[typing.Any]:
+    if not os.path.isfile(file_name):
+        logging.info("no snapshot: %s", file_name)
+        return None
+    with open(file_name, "rb") as snapshot_file:
+        if os.fstat(snapshot_file.fileno()).st_size < _HEADER.size:
+            logging.warning("truncated snapshot: %s", file_name)
+            return None
+        with mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            magic, snapshot_format, snapshot_fingerprint = _HEADER.unpack_from(data)
+            if magic != SNAPSHOT_MAGIC or snapshot_format != SNAPSHOT_FORMAT:
+                logging.info("snapshot has unsupported format: %s", file_name)
+                return None
+            if snapshot_fingerprint != source_fingerprint:
+                logging.info("snapshot is stale: %s", file_name)
+                return None
+            # the unpickled graph consists of many small objects; collecting while loading only costs time
+            gc_enabled = gc.isenabled()
+            gc.disable()
+            payload = memoryview(data)[_HEADER.size :]
+            try:
+                return pickle.loads(payload)
+            except Exception:  # pylint: disable=broad-except
+                logging.warning("failed to read snapshot: %s", file_name)
+                return None
+            finally:
+                payload.release()
+                if gc_enabled:
+                    gc.enable()
@@ -0,0 +1,265 @@
+import concurrent.futures
+import functools
+import gzip
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import time
+import typing
+
+from flask import render_template
+
+from unicode import app, site_routes
+from unicode.block import Block, BlockInfo, Subblock
+from unicode.codepoint import Codepoint, CodepointInfo
+from unicode.summaries import topic_from_url
+from unicode.version import __version__
+
+# page path -> fingerprint of everything the page was rendered from
+STATIC_MANIFEST = ".render-static.json"
+CHUNK_SIZE = 1000
+
+# (kind, code, page); page 0 is the "All" page of a block
+Page = typing.Tuple[str, int, int]
+
+
+class RenderResult(typing.NamedTuple):
+    fingerprints: typing.Dict[str, str]
+    rendered: int
+
+
+class RenderContext(typing.NamedTuple):
+    out_dir: str
+    # page path -> fingerprint of the last run
+    previous: typing.Dict[str, str]
+    base_fingerprint: str
+    compress: bool
+
+
+def render_static(out_dir: str, workers: int, compress: bool) -> typing.Tuple[int, int]:
+    # Renders all codepoint pages, all block pages, the sitemaps and robots.txt to 'out_dir'.
+    # Pages whose fingerprint did not change since the last run are not rendered again.
+    # Returns the number of rendered and skipped pages.
+    start_time = time.time()
+    os.makedirs(out_dir, exist_ok=True)
+    previous = read_manifest(out_dir)
+    context = RenderContext(out_dir, previous, templates_fingerprint(), compress)
+    # the block pages only use summaries that are already cached; finishing pending fetches first also
+    # ensures that no fetch thread holds a lock while the workers are forked
+    app.summaries.wait()
+
+    results = _render_pages(context, static_pages(), workers)
+    results.append(_render_site_files(context))
+    fingerprints: typing.Dict[str, str] = {}
+    rendered = 0
+    for result in results:
+        fingerprints.update(result.fingerprints)
+        rendered += result.rendered
+
+    update_manifest(out_dir, previous, fingerprints)
+    elapsed_time = time.time() - start_time
+    logging.info("rendered %d of %d pages in %.2fs", rendered, len(fingerprints), elapsed_time)
+    return rendered, len(fingerprints) - rendered
+
+
+def static_pages() -> typing.List[Page]:
+    # Every codepoint of a block gets a page (like /c/<code> of the server), since the prev/next links and
+    # the block grids also point to the unassigned codepoints of a block.
+    # The web server has to map /c/<code> to c/<code>.html etc. (see "Static Export" in README.md).
+    pages: typing.List[Page] = []
+    for info in app.unicode_info.get_block_infos():
+        block = app.unicode_info.get_block(info.block_id())
+        assert block is not None
+        pages.extend(("c", code, 1) for code in range(block.from_codepoint(), block.to_codepoint() + 1))
+        page_count = app.block_page_count(block)
+        pages.extend(("b", info.block_id(), page) for page in range(1, page_count + 1))
+        if page_count > 1:
+            # the "All" page of a paged block
+            pages.append(("b", info.block_id(), 0))
+    return pages
+
+
+def update_manifest(out_dir: str, previous: typing.Dict[str, str], fingerprints: typing.Dict[str, str]) -> None:
+    for path in set(previous) - set(fingerprints):
+        # pages that no longer exist (e.g. when a block was removed)
+        for file_name in [path, f"{path}.gz"]:
+            if os.path.isfile(os.path.join(out_dir, file_name)):
+                os.remove(os.path.join(out_dir, file_name))
+    write_manifest(out_dir, fingerprints)
+
+
+def page_path(page: Page) -> str:
+    kind, code, number = page
+    if number == 0:
+        return f"{kind}/{code:04X}/all.html"
+    if number > 1:
+        return f"{kind}/{code:04X}/{number}.html"
+    return f"{kind}/{code:04X}.html"
+
+
+def read_manifest(out_dir: str) -> typing.Dict[str, str]:
+    try:
+        with open(os.path.join(out_dir, STATIC_MANIFEST), "r", encoding="utf-8") as manifest_file:
+            manifest = json.load(manifest_file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def write_manifest(out_dir: str, manifest: typing.Dict[str, str]) -> None:
+    file_name = os.path.join(out_dir, STATIC_MANIFEST)
+    with open(f"{file_name}.tmp", "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, sort_keys=True)
+    os.replace(f"{file_name}.tmp", file_name)
+
+
+def templates_fingerprint() -> str:
+    # everything that affects all pages: the templates, the site configuration and the package version
+    digest = hashlib.sha256(__version__.encode("utf-8"))
+    template_dir = os.path.join(app.flask_app.root_path, app.flask_app.template_folder or "templates")
+    for root, _, file_names in sorted(os.walk(template_dir)):
+        for file_name in sorted(file_names):
+            with open(os.path.join(root, file_name), "rb") as template_file:
+                digest.update(file_name.encode("utf-8"))
+                digest.update(template_file.read())
+    for key in ["BASE_URL", "META", "BOTTOM"]:
+        digest.update(repr(app.flask_app.config.get(key)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def page_fingerprint(base_fingerprint: str, data: typing.Any) -> str:
+    return hashlib.sha256(f"{base_fingerprint}:{_fingerprint_value(data)!r}".encode("utf-8")).hexdigest()
+
+
+def _fingerprint_value(value: typing.Any) -> typing.Any:  # pylint: disable=too-many-return-statements
+    # the data shown on a page as plain (comparable, repr-able) values
+    if isinstance(value, Codepoint):
+        return (
+            value.codepoint_id(),
+            value.name(),
+            value.block,
+            value.subblock,
+            value.case,
+            value.prev,
+            value.next,
+            value.alternate,
+            value.linked_comments,
+            list(value.related),
+            list(value.confusables),
+            value.combinables,
+        )
+    if isinstance(value, CodepointInfo):
+        return (value.codepoint_id(), value.name())
+    if isinstance(value, Block):
+        return (value.block_id(), value.name(), value.to_codepoint(), value.wikipedia, value.prev, value.next)
+    if isinstance(value, BlockInfo):
+        return (value.block_id(), value.name())
+    if isinstance(value, Subblock):
+        return (value.block_id(), value.name(), value.to_codepoint())
+    if isinstance(value, dict):
+        return sorted((key, _fingerprint_value(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return [_fingerprint_value(item) for item in value]
+    return value
+
+
+def _render_pages(context: RenderContext, pages: typing.List[Page], workers: int) -> typing.List[RenderResult]:
+    chunks = []
+    for i in range(0, len(pages), CHUNK_SIZE):
+        chunk = pages[i : i + CHUNK_SIZE]
+        # only the fingerprints of its own pages are sent to a worker
+        previous = {page_path(page): context.previous.get(page_path(page), "") for page in chunk}
+        chunks.append((RenderContext(context.out_dir, previous, context.base_fingerprint, context.compress), chunk))
+    if workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+        # forked workers share the loaded data with this process instead of loading it again
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("fork")
+        ) as executor:
+            futures = [executor.submit(_render_chunk, *chunk) for chunk in chunks]
+            return [future.result() for future in futures]
+    return [_render_chunk(*chunk) for chunk in chunks]
+
+
+def _render_chunk(context: RenderContext, chunk: typing.List[Page]) -> RenderResult:
+    fingerprints: typing.Dict[str, str] = {}
+    rendered = 0
+    with app.flask_app.test_request_context():
+        for page in chunk:
+            kind, code, number = page
+            path = page_path(page)
+            if kind == "c":
+                data = app.code_page_data(code)
+                template = "code.html"
+            else:
+                block = app.unicode_info.get_block(code)
+                assert block is not None
+                summary = (app.summaries.cached(topic_from_url(block.wikipedia)) if block.wikipedia else None) or ""
+                data = app.block_page_data(code, summary, number)
+                # the "All" page generates its characters while rendering, but the fingerprint needs them
+                data["chars"] = list(data["chars"])
+                template = "block.html"
+            fingerprint = page_fingerprint(context.base_fingerprint, data)
+            if _write_page(
+                context,
+                path,
+                fingerprint,
+                lambda: render_template(template, data=data),  # pylint: disable=cell-var-from-loop
+            ):
+                rendered += 1
+            fingerprints[path] = fingerprint
+    return RenderResult(fingerprints, rendered)
+
+
+def _render_site_files(context: RenderContext) -> RenderResult:
+    # sitemap.txt, the sitemaps and robots.txt
+    with app.flask_app.test_request_context():
+        block_infos = app.unicode_info.get_block_infos()
+        sitemap = site_routes.current_sitemap()
+        files: typing.List[typing.Tuple[str, typing.Any, typing.Callable[[], str]]] = [
+            ("sitemap.txt", block_infos, lambda: render_template("sitemap.txt", blocks=block_infos)),
+            # the sitemaps only depend on the data version (and the base url)
+            (
+                "sitemap.xml",
+                [app.unicode_info.data_version(), "sitemap.xml"],
+                lambda: "".join(sitemap.index(lambda shard: f"/sitemaps/{shard}.xml")),
+            ),
+            ("robots.txt", [], lambda: render_template("robots.txt")),
+        ]
+        for shard in range(sitemap.shard_count()):
+            path = f"sitemaps/{shard}.xml"
+            files.append(
+                (path, [app.unicode_info.data_version(), path], functools.partial("".join, sitemap.shard(shard)))
+            )
+        fingerprints: typing.Dict[str, str] = {}
+        rendered = 0
+        for path, data, render in files:
+            fingerprint = page_fingerprint(context.base_fingerprint, data)
+            if _write_page(context, path, fingerprint, render):
+                rendered += 1
+            fingerprints[path] = fingerprint
+    return RenderResult(fingerprints, rendered)
+
+
+def _write_page(context: RenderContext, path: str, fingerprint: str, render: typing.Callable[[], str]) -> bool:
+    file_name = os.path.join(context.out_dir, path)
+    if (
+        fingerprint == context.previous.get(path, "")
+        and os.path.isfile(file_name)
+        and (not context.compress or os.path.isfile(f"{file_name}.gz"))
+    ):
+        return False
+    page = render().encode("utf-8")
+    os.makedirs(os.path.dirname(file_name), exist_ok=True)
+    _write_file(file_name, page)
+    if context.compress:
+        # mtime=0 keeps the compressed files identical across runs
+        _write_file(f"{file_name}.gz", gzip.compress(page, compresslevel=9, mtime=0))
+    return True
+
+
+def _write_file(file_name: str, data: bytes) -> None:
+    with open(f"{file_name}.tmp", "wb") as page_file:
+        page_file.write(data)
+    os.replace(f"{file_name}.tmp", file_name)
@@ -0,0 +1,409 @@
+import array
+import bisect
+import html
+import itertools
+import typing
+
+from unicode.codepoint import RE_CODE_REFERENCE, Codepoint, CodepointInfo, code_link
+
+UNASSIGNED = "<unassigned>"
+
+# marker for 'no value' in the integer columns (block, subblock, case, cluster)
+NONE = -1
+
+
+# columns and relations are frozen into pages of PAGE_SIZE codepoints; identical pages are stored once
+PAGE_BITS = 8
+PAGE_SIZE = 1 << PAGE_BITS
+PAGE_MASK = PAGE_SIZE - 1
+
+
+def _column(size: int, value: int) -> "array.array[int]":
+    return array.array("i", [value]) * size
+
+
+class PagePool:
+    # Identical pages are shared: within a store (e.g. the pages of unassigned planes) and between the
+    # stores of several Unicode versions that are frozen with the same pool.
+    def __init__(self) -> None:
+        self._pages: typing.Dict[typing.Tuple[str, bytes], "array.array[int]"] = {}
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def intern(self, page: "array.array[int]") -> "array.array[int]":
+        return self._pages.setdefault((page.typecode, page.tobytes()), page)
+
+
+class PagedColumn:
+    # a read-only integer column, stored as (shared) pages
+    __slots__ = ("_pages", "_size")
+
+    def __init__(self, column: "array.array[int]", pool: PagePool) -> None:
+        self._pages = [pool.intern(column[first : first + PAGE_SIZE]) for first in range(0, len(column), PAGE_SIZE)]
+        self._size = len(column)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, code: int) -> int:
+        return self._pages[code >> PAGE_BITS][code & PAGE_MASK]
+
+    def __setitem__(self, index: typing.Union[int, slice], value: typing.Any) -> None:
+        raise RuntimeError("cannot modify a frozen column")
+
+    def __iter__(self) -> typing.Iterator[int]:
+        return itertools.chain.from_iterable(self._pages)
+
+    def pages(self) -> typing.List["array.array[int]"]:
+        return self._pages
+
+    def values(self, range_from: int, range_to: int) -> typing.Iterator[int]:
+        # the values of the codes range_from..range_to
+        for page in range(range_from >> PAGE_BITS, (range_to >> PAGE_BITS) + 1):
+            first = page << PAGE_BITS
+            yield from self._pages[page][max(range_from - first, 0) : min(range_to - first, PAGE_MASK) + 1]
+
+
+class RangeMap:
+    # A column that is constant over ranges of codes (e.g. the block of each codepoint), stored as sorted,
+    # non-overlapping ranges; codes outside of all ranges have no value (NONE).
+    __slots__ = ("_starts", "_ends", "_values", "_size")
+
+    def __init__(self, size: int) -> None:
+        self._starts: "array.array[int]" = array.array("i")
+        self._ends: "array.array[int]" = array.array("i")
+        self._values: "array.array[int]" = array.array("i")
+        self._size = size
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, code: int) -> int:
+        index = bisect.bisect_right(self._starts, code) - 1
+        if index < 0 or code > self._ends[index]:
+            return NONE
+        return self._values[index]
+
+    def set(self, range_from: int, range_to: int, value: int) -> None:
+        # replaces the values of the codes range_from..range_to; the overlapped ranges are cut
+        first = bisect.bisect_left(self._ends, range_from)
+        last = bisect.bisect_right(self._starts, range_to)
+        ranges = []
+        if first < last and self._starts[first] < range_from:
+            ranges.append((self._starts[first], range_from - 1, self._values[first]))
+        if value != NONE:
+            ranges.append((range_from, range_to, value))
+        if first < last and self._ends[last - 1] > range_to:
+            ranges.append((range_to + 1, self._ends[last - 1], self._values[last - 1]))
+        for column, position in [(self._starts, 0), (self._ends, 1), (self._values, 2)]:
+            column[first:last] = array.array("i", (item[position] for item in ranges))
+
+    def ranges(self) -> typing.Iterator[typing.Tuple[int, int, int]]:
+        return zip(self._starts, self._ends, self._values)
+
+    def end_before(self, code: int) -> int:
+        # the last code of the last range that ends before 'code'
+        index = bisect.bisect_left(self._ends, code) - 1
+        return self._ends[index] if index >= 0 else NONE
+
+    def start_after(self, code: int) -> int:
+        # the first code of the first range that starts after 'code'
+        index = bisect.bisect_right(self._starts, code)
+        return self._starts[index] if index < len(self._starts) else NONE
+
+
+Column = typing.Union["array.array[int]", PagedColumn]
+
+
+class StringTable:
+    # all strings are kept in a single utf-8 encoded blob; a string is referenced by its index. A frozen
+    # table can be thawed to add more strings (e.g. those of another Unicode version); the indexes of the
+    # existing strings do not change.
+    def __init__(self) -> None:
+        self._strings: typing.List[str] = []
+        self._index: typing.Dict[str, int] = {}
+        self._blob = b""
+        self._offsets: "array.array[int]" = array.array("I", [0])
+        self._frozen = False
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1 + len(self._strings)
+
+    def add(self, string: str) -> int:
+        index = self._index.get(string)
+        if index is None:
+            if self._frozen:
+                raise RuntimeError("cannot add strings to a frozen string table")
+            index = len(self)
+            self._strings.append(string)
+            self._index[string] = index
+        return index
+
+    def get(self, index: int) -> str:
+        frozen_count = len(self._offsets) - 1
+        if index >= frozen_count:
+            return self._strings[index - frozen_count]
+        return self._blob[self._offsets[index] : self._offsets[index + 1]].decode("utf-8")
+
+    def freeze(self) -> None:
+        self._frozen = True
+        if not self._strings:
+            self._index = {}
+            return
+        encoded = [string.encode("utf-8") for string in self._strings]
+        offsets = array.array("I", [0]) * len(encoded)
+        position = self._offsets[-1]
+        for i, data in enumerate(encoded):
+            position += len(data)
+            offsets[i] = position
+        self._blob = self._blob + b"".join(encoded)
+        self._offsets.extend(offsets)
+        self._strings = []
+        self._index = {}
+
+    def thaw(self) -> None:
+        if not self._frozen:
+            return
+        self._index = {self.get(index): index for index in range(len(self))}
+        self._frozen = False
+
+
+def _pack(
+    items: typing.List[typing.Tuple[int, typing.List[int]]], first: int, count: int
+) -> typing.Tuple["array.array[int]", "array.array[int]"]:
+    # CSR arrays of the codes first..first+count-1; 'items' are sorted and within that range
+    offsets = array.array("I", [0]) * (count + 1)
+    values = array.array("i")
+    last_code = 0
+    for code, code_values in items:
+        code -= first
+        offsets[last_code + 1 : code + 1] = array.array("I", [len(values)]) * (code - last_code)
+        values.extend(code_values)
+        last_code = code
+    offsets[last_code + 1 :] = array.array("I", [len(values)]) * (count - last_code)
+    return offsets, values
+
+
+class Relation:
+    # variable-length per-codepoint values; collected in a dict while loading, then packed into pages of
+    # CSR-style arrays: the values of code c (on page p, at index i) are values[p][offsets[p][i]:offsets[p][i + 1]]
+    def __init__(self) -> None:
+        self._pending: typing.Dict[int, typing.List[int]] = {}
+        self._offset_pages: typing.List["array.array[int]"] = []
+        self._value_pages: typing.List["array.array[int]"] = []
+        self._size = 0
+        self._frozen = False
+
+    def frozen(self) -> bool:
+        return self._frozen
+
+    def append(self, code: int, value: int) -> None:
+        if self.frozen():
+            raise RuntimeError("cannot modify a frozen relation")
+        self._pending.setdefault(code, []).append(value)
+
+    def set(self, code: int, values: typing.List[int]) -> None:
+        if self.frozen():
+            raise RuntimeError("cannot modify a frozen relation")
+        self._pending[code] = values
+
+    def get(self, code: int) -> typing.Sequence[int]:
+        if self.frozen():
+            if code >= self._size:
+                return ()
+            offsets = self._offset_pages[code >> PAGE_BITS]
+            index = code & PAGE_MASK
+            return self._value_pages[code >> PAGE_BITS][offsets[index] : offsets[index + 1]]
+        return self._pending.get(code, ())
+
+    def items(self) -> typing.Iterator[typing.Tuple[int, typing.Sequence[int]]]:
+        if self.frozen():
+            for page, offsets in enumerate(self._offset_pages):
+                if offsets[0] == offsets[-1]:
+                    continue
+                for index in range(len(offsets) - 1):
+                    if offsets[index] != offsets[index + 1]:
+                        yield (page << PAGE_BITS) + index, self.get((page << PAGE_BITS) + index)
+        else:
+            yield from sorted(self._pending.items())
+
+    def pages(self) -> typing.List["array.array[int]"]:
+        return self._offset_pages + self._value_pages
+
+    def freeze(self, size: int, pool: typing.Optional[PagePool] = None) -> None:
+        if self.frozen():
+            return
+        if pool is None:
+            pool = PagePool()
+        items = sorted(self._pending.items())
+        position = 0
+        for first in range(0, size, PAGE_SIZE):
+            count = min(PAGE_SIZE, size - first)
+            end = position
+            while end < len(items) and items[end][0] < first + count:
+                end += 1
+            offsets, values = _pack(items[position:end], first, count)
+            self._offset_pages.append(pool.intern(offsets))
+            self._value_pages.append(pool.intern(values))
+            position = end
+        self._size = size
+        self._pending = {}
+        self._frozen = True
+
+
+class CodepointStore:  # pylint: disable=too-many-instance-attributes
+    # columnar storage of all codepoint data; Codepoint and CodepointInfo objects are views into it
+    def __init__(self, size: int = 0, strings: typing.Optional[StringTable] = None) -> None:
+        # blocks and subblocks are ranges; the previous and next codepoints follow from the block ranges
+        self.block = RangeMap(size)
+        self.subblock = RangeMap(size)
+        self.case: Column = _column(size, NONE)
+        # the string table may be shared with the stores of other Unicode versions
+        self.strings = strings if strings is not None else StringTable()
+        self.strings.thaw()
+        self.unassigned = self.strings.add(UNASSIGNED)
+        self.names: Column = _column(size, self.unassigned)
+        self.alternate = Relation()
+        self.comments = Relation()
+        # comment string index -> comment with links, built on first use
+        self._linked_comments: typing.Dict[int, str] = {}
+        self.related = Relation()
+        # confusable clusters: each codepoint refers to its cluster, which lists all members once
+        self.cluster: Column = _column(size, NONE)
+        self.clusters = Relation()
+        self.cluster_count = 0
+        self.combinables = Relation()
+        self.sequences: typing.List[typing.Tuple[int, ...]] = []
+        # "/v/<version>" for the codepoints of an additional Unicode version
+        self.url_prefix = ""
+        # the codepoints with a name, in order; built by freeze
+        self.assigned: "array.array[int]" = array.array("i")
+
+    def __len__(self) -> int:
+        return len(self.block)
+
+    def contains(self, code: typing.Optional[int]) -> bool:
+        return code is not None and 0 <= code < len(self.block) and self.block[code] != NONE
+
+    def get(self, code: typing.Optional[int]) -> typing.Optional[Codepoint]:
+        if code is None or not self.contains(code):
+            return None
+        return Codepoint(self, code)
+
+    def get_info(self, code: typing.Optional[int]) -> typing.Optional[CodepointInfo]:
+        if code is None or not self.contains(code):
+            return None
+        return CodepointInfo(self, code)
+
+    def add_block(self, block_id: int, range_from: int, range_to: int) -> None:
+        self.block.set(range_from, range_to, block_id)
+        self.names[range_from : range_to + 1] = _column(range_to + 1 - range_from, self.unassigned)
+
+    def prev_code(self, code: int) -> int:
+        # the previous codepoint that exists (i.e. is covered by a block)
+        if self.contains(code - 1):
+            return code - 1
+        return self.block.end_before(code)
+
+    def next_code(self, code: int) -> int:
+        if self.contains(code + 1):
+            return code + 1
+        return self.block.start_after(code)
+
+    def name(self, code: int) -> str:
+        return self.strings.get(self.names[code])
+
+    def name_indexes(self, range_from: int, range_to: int) -> typing.Iterable[int]:
+        # the (string table) indexes of the names of the codes range_from..range_to
+        if isinstance(self.names, PagedColumn):
+            return self.names.values(range_from, range_to)
+        return self.names[range_from : range_to + 1]
+
+    def set_name(self, code: int, name: str) -> None:
+        self.names[code] = self.strings.add(name)
+
+    def add_alternate(self, code: int, alternate: str) -> None:
+        self.alternate.append(code, self.strings.add(alternate))
+
+    def add_comment(self, code: int, comment: str) -> None:
+        self.comments.append(code, self.strings.add(comment))
+
+    def linked_comment(self, index: int) -> str:
+        # the comment as html, with links for the mentioned codes that exist; the comment is scanned once
+        # and the text between the codes is escaped
+        linked = self._linked_comments.get(index)
+        if linked is None:
+            comment = self.strings.get(index)
+            parts = []
+            position = 0
+            for match in RE_CODE_REFERENCE.finditer(comment):
+                if self.contains(int(match.group(), 16)):
+                    parts.append(html.escape(comment[position : match.start()]))
+                    parts.append(code_link(match.group(), self.url_prefix))
+                    position = match.end()
+            parts.append(html.escape(comment[position:]))
+            linked = "".join(parts)
+            self._linked_comments[index] = linked
+        return linked
+
+    def add_combinable(self, code: int, sequence: typing.List[int]) -> None:
+        self.combinables.append(code, len(self.sequences))
+        self.sequences.append(tuple(sequence))
+
+    def add_cluster(self, members: typing.List[int]) -> None:
+        for code in members:
+            self.cluster[code] = self.cluster_count
+        self.clusters.set(self.cluster_count, members)
+        self.cluster_count += 1
+
+    def get_confusables(self, code: int) -> typing.List[int]:
+        cluster = self.cluster[code]
+        if cluster == NONE:
+            return []
+        return [member for member in self.clusters.get(cluster) if member != code]
+
+    def get_strings(self, relation: Relation, code: int) -> typing.List[str]:
+        return [self.strings.get(index) for index in relation.get(code)]
+
+    def get_sequences(self, code: int) -> typing.List[typing.Tuple[int, ...]]:
+        return [self.sequences[index] for index in self.combinables.get(code)]
+
+    def freeze(self, pool: typing.Optional[PagePool] = None) -> None:
+        if pool is None:
+            pool = PagePool()
+        size = len(self)
+        for name in ["case", "names", "cluster"]:
+            column = getattr(self, name)
+            if not isinstance(column, PagedColumn):
+                setattr(self, name, PagedColumn(column, pool))
+        for relation in [self.alternate, self.comments, self.related, self.combinables]:
+            relation.freeze(size, pool)
+        self.clusters.freeze(self.cluster_count, pool)
+        self.strings.freeze()
+        self.assigned = array.array("i")
+        for range_from, range_to, _ in self.block.ranges():
+            self.assigned.extend(
+                code
+                for code, name_index in zip(range(range_from, range_to + 1), self.name_indexes(range_from, range_to))
+                if name_index != self.unassigned
+            )
+
+    def changed_names(self, other: "CodepointStore") -> typing.Iterator[int]:
+        # the codes whose names differ from those in 'other'; pages shared by both stores are skipped
+        if not isinstance(self.names, PagedColumn) or not isinstance(other.names, PagedColumn):
+            raise RuntimeError("cannot compare stores that are not frozen")
+        for page, (names, other_names) in enumerate(zip(self.names.pages(), other.names.pages())):
+            if names is other_names:
+                continue
+            for index in range(len(names)):
+                code = (page << PAGE_BITS) + index
+                if self.name(code) != other.name(code):
+                    yield code
+
+    def pages(self) -> typing.Iterator["array.array[int]"]:
+        for column in [self.case, self.names, self.cluster]:
+            if isinstance(column, PagedColumn):
+                yield from column.pages()
+        for relation in [self.alternate, self.comments, self.related, self.combinables, self.clusters]:
+            yield from relation.pages()
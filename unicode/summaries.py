@@ -0,0 +1,189 @@
+import concurrent.futures
+import json
+import logging
+import os
+import re
+import threading
+import time
+import typing
+
+import wikipedia  # type: ignore
+
+from unicode.codepoint import code_link
+
+Fetcher = typing.Callable[[str], str]
+
+
+def fetch_wikipedia_summary(topic: str) -> str:
+    return str(wikipedia.summary(topic, sentences=3))
+
+
+def topic_from_url(url: str) -> str:
+    return url.split("/")[-1].replace("_", " ")
+
+
+class SummaryCache:
+    # Wikipedia summaries of the blocks. Request handlers only read from the cache; missing or expired
+    # summaries are fetched by a background worker pool, at most one fetch per topic at a time, and
+    # persisted to 'cache_file_name'.
+    def __init__(
+        self,
+        fetcher: Fetcher = fetch_wikipedia_summary,
+        cache_file_name: typing.Optional[str] = None,
+        ttl: float = 30 * 24 * 60 * 60,
+        workers: int = 2,
+    ) -> None:
+        self._fetcher = fetcher
+        self._cache_file_name = cache_file_name
+        self._ttl = ttl
+        self._workers = workers
+        self._summaries: typing.Dict[str, typing.Tuple[float, str]] = {}
+        self._pending: typing.Dict[str, concurrent.futures.Future] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._executor: typing.Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._pid = os.getpid()
+        self._load()
+
+    def configure(self, cache_file_name: typing.Optional[str], ttl: float, workers: int) -> None:
+        with self._lock:
+            self._cache_file_name = cache_file_name
+            self._ttl = ttl
+            self._workers = workers
+        self._load()
+
+    def get(self, topic: str) -> typing.Optional[str]:
+        # returns the cached (possibly expired) summary or None; never waits for the network
+        with self._lock:
+            entry = self._summaries.get(topic)
+            if entry is None or time.time() - entry[0] > self._ttl:
+                self._schedule(topic)
+            return entry[1] if entry is not None else None
+
+    def cached(self, topic: str) -> typing.Optional[str]:
+        # like get, but without scheduling a fetch
+        with self._lock:
+            entry = self._summaries.get(topic)
+            return entry[1] if entry is not None else None
+
+    def prefetch(self, topics: typing.Iterable[str]) -> None:
+        with self._lock:
+            now = time.time()
+            for topic in topics:
+                entry = self._summaries.get(topic)
+                if entry is None or now - entry[0] > self._ttl:
+                    self._schedule(topic)
+
+    def wait(self, timeout: typing.Optional[float] = None) -> None:
+        with self._lock:
+            futures = list(self._pending.values())
+        concurrent.futures.wait(futures, timeout=timeout)
+
+    def _schedule(self, topic: str) -> None:
+        # requires self._lock
+        if self._executor is None or self._pid != os.getpid():
+            # worker threads do not survive a fork, so each process starts its own pool
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self._workers, thread_name_prefix="wikipedia"
+            )
+            self._pending = {}
+            self._pid = os.getpid()
+        if topic in self._pending:
+            return
+        self._pending[topic] = self._executor.submit(self._fetch, topic)
+
+    def _fetch(self, topic: str) -> None:
+        try:
+            summary = format_summary(self._fetcher(topic))
+        except Exception:  # pylint: disable=broad-except
+            logging.warning("Failed to fetch wikipedia infos for topic %s", topic)
+            summary = None
+        with self._lock:
+            del self._pending[topic]
+            if summary is not None:
+                self._summaries[topic] = (time.time(), summary)
+                self._dirty = True
+            elif topic not in self._summaries:
+                # remember the failure, so that it is only retried after the ttl
+                self._summaries[topic] = (time.time(), "")
+            if self._dirty and not self._pending:
+                self._save()
+
+    def _load(self) -> None:
+        if self._cache_file_name is None or not os.path.isfile(self._cache_file_name):
+            return
+        try:
+            with open(self._cache_file_name, "r", encoding="utf-8") as cache_file:
+                data = json.load(cache_file)
+        except (OSError, json.JSONDecodeError):
+            logging.warning("failed to read wikipedia cache: %s", self._cache_file_name)
+            return
+        with self._lock:
+            for topic, (fetch_time, summary) in data.items():
+                if topic not in self._summaries:
+                    self._summaries[topic] = (fetch_time, summary)
+
+    def _save(self) -> None:
+        # requires self._lock
+        if self._cache_file_name is None:
+            return
+        data = {topic: entry for topic, entry in self._summaries.items() if entry[1]}
+        tmp_file_name = f"{self._cache_file_name}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_file_name, "w", encoding="utf-8") as cache_file:
+                json.dump(data, cache_file)
+            os.replace(tmp_file_name, self._cache_file_name)
+            self._dirty = False
+        except OSError:
+            logging.warning("failed to write wikipedia cache: %s", self._cache_file_name)
+
+
+def format_summary(wikipedia_text: str) -> str:
+    lines = []
+    last_empty = True
+
+    re_h2 = re.compile(r"^== (.*) ==$")
+    re_h3 = re.compile(r"^=== (.*) ===$")
+
+    for line in wikipedia_text.split("\n"):
+        line = line.strip()
+        if not line:
+            if not last_empty:
+                lines.append("")
+            last_empty = True
+            continue
+
+        last_empty = False
+        match = re_h2.match(line)
+        if match:
+            lines.append(f"<b>{match.group(1)}</b>")
+            continue
+        match = re_h3.match(line)
+        if match:
+            lines.append(f"<b>{match.group(1)}</b>")
+            continue
+
+        lines.append(_replace_codepoints_with_links(line))
+    return "<br />\n".join(lines)
+
+
+def _replace_codepoints_with_links(s: str) -> str:
+    re_single_code = re.compile(r"U\+([0-9A-Fa-f]{4,6})\b")
+    re_code_range = re.compile(r"\b([0-9A-Fa-f]{4,6})[-–—]([0-9A-Fa-f]{4,6})\b")
+
+    replacements = []
+    for match in re_single_code.finditer(s):
+        original = match.group(0)
+        code = match.group(1).upper()
+        replacements.append((original, code_link(code)))
+    for match in re_code_range.finditer(s):
+        from_original = match.group(1)
+        to_original = match.group(2)
+        from_code = from_original.upper()
+        to_code = from_original.upper()
+        replacements.append((from_original, code_link(from_code)))
+        replacements.append((to_original, code_link(to_code)))
+    for replacement in replacements:
+        s = s.replace(replacement[0], replacement[1])
+
+    return s
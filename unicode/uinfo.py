@@ -1,3 +1,5 @@
+import array
+import concurrent.futures
 import logging
 import os
 import random
@@ -5,71 +7,116 @@ import re
 import time
 import typing
 
+from unicode import download, parsers, snapshot
 from unicode.block import Block, BlockInfo, Subblock
-from unicode.codepoint import Codepoint, CodepointInfo, code_link, hex2id
-
-
-def all_in(needles: typing.List[str], haystack: str) -> bool:
-    for needle in needles:
-        if needle not in haystack:
-            return False
-    return True
+from unicode.codepoint import Codepoint, CodepointInfo, hex2id
+from unicode.confusables import SkeletonTable
+from unicode.search import NameIndex
+from unicode.store import NONE, UNASSIGNED, CodepointStore, PagePool, StringTable
+from unicode.unihan import DEFAULT_UNIHAN_FIELDS, UnihanFields
+
+# CJK blocks are deprioritized in searches, since their characters have very long descriptive names
+DEPRIORITIZED_BLOCKS = {
+    0x2E80,
+    0x2F00,
+    0x31C0,
+    0x3300,
+    0x3400,
+    0x4E00,
+    0xF900,
+    0x20000,
+    0x2A700,
+    0x2B740,
+    0x2B820,
+    0x2F800,
+}
+
+# the blocks with Unihan data: the CJK unified ideographs (up to Extension I) and the compatibility ideographs
+CJK_IDEOGRAPH_BLOCKS = {
+    0x3400,
+    0x4E00,
+    0xF900,
+    0x20000,
+    0x2A700,
+    0x2B740,
+    0x2B820,
+    0x2CEB0,
+    0x2EBF0,
+    0x2F800,
+    0x30000,
+    0x31350,
+}
+
+# blocks of the random characters on the welcome page
+RANDOM_BLOCKS = [0x0180, 0x0250, 0x1F600, 0x1F0A0, 0x1F680, 0x0370, 0x0900, 0x0700, 0x0400, 0x2200, 0x2190]
+
+RE_NON_ALPHA = re.compile("[^a-z]+")
+
+
+def normalize_block_name(name: str) -> str:
+    return RE_NON_ALPHA.sub("", name.lower())
 
 
 class UInfo:
     def __init__(self) -> None:
         self._blocks: typing.Dict[int, Block] = {}
-        self._codepoints: typing.List[typing.Optional[Codepoint]] = []
+        self._codepoints = CodepointStore()
         self._subblocks: typing.Dict[int, Subblock] = {}
+        self._block_infos: typing.List[BlockInfo] = []
+        self._block_ids_by_name: typing.Dict[str, int] = {}
+        self._name_index = NameIndex([])
+        self._name_index_deprioritized = NameIndex([])
+        self._unihan = UnihanFields("", [])
+        self._random_pool: "array.array[int]" = array.array("i")
+        self._data_version = ""
+        self._skeletons = SkeletonTable()
+
+    def data_version(self) -> str:
+        return self._data_version
 
     def get_codepoint(self, code: typing.Optional[int]) -> typing.Optional[Codepoint]:
-        if code is None or code < 0 or code >= len(self._codepoints):
-            return None
-        return self._codepoints[code]
+        return self._codepoints.get(code)
 
     def get_block(self, block_id: typing.Optional[int]) -> typing.Optional[Block]:
         if block_id is None or block_id not in self._blocks:
             return None
-        block = self._blocks[block_id]
-        block.fetch_wikipedia()
-        return block
+        return self._blocks[block_id]
 
     def get_codepoint_info(self, code: typing.Optional[int]) -> typing.Optional[CodepointInfo]:
-        if code is None or code < 0 or code >= len(self._codepoints):
-            return None
-        codepoint = self._codepoints[code]
-        return codepoint.info if codepoint else None
+        return self._codepoints.get_info(code)
+
+    def get_unihan(self, code: int) -> typing.List[typing.Tuple[str, str]]:
+        # only CJK pages need the (lazily loaded) additional Unihan fields
+        if not self._codepoints.contains(code) or self._codepoints.block[code] not in CJK_IDEOGRAPH_BLOCKS:
+            return []
+        return self._unihan.get(code)
+
+    def set_unihan_fields(self, fields: typing.List[str]) -> None:
+        self._unihan = UnihanFields(self._unihan.zip_file_name(), fields)
 
     def get_random_char_infos(self, count: int) -> typing.List[CodepointInfo]:
-        blocks = [
-            0x0180,
-            0x0250,
-            0x1F600,
-            0x1F0A0,
-            0x1F680,
-            0x0370,
-            0x0900,
-            0x0700,
-            0x0400,
-            0x2200,
-            0x2190,
-        ]
-        candidates = []
-        for block_id in blocks:
-            block = self.get_block(block_id)
-            if block is not None:
-                for i in block.codepoints_iter():
-                    candidates.append(i)
-        return list(filter(None, [self.get_codepoint_info(code) for code in random.sample(candidates, count)]))
+        pool = self._random_pool
+        count = min(count, len(pool))
+        # sampling from a range object does not copy the pool
+        return [CodepointInfo(self._codepoints, pool[index]) for index in random.sample(range(len(pool)), count)]
+
+    def set_random_blocks(self, block_ids: typing.Iterable[int]) -> None:
+        pool: "array.array[int]" = array.array("i")
+        for block_id in block_ids:
+            block = self._blocks.get(block_id)
+            if block is None:
+                logging.warning("unknown random block: %04X", block_id)
+                continue
+            pool.extend(block.codepoints_iter())
+        self._random_pool = pool
 
     def get_block_id_by_name(self, name: str) -> typing.Optional[int]:
-        re_non_alpha = re.compile("[^a-z]+")
-        name = re_non_alpha.sub("", name.lower())
+        return self._block_ids_by_name.get(normalize_block_name(name))
 
-        for block_id, block in self._blocks.items():
-            if re_non_alpha.sub("", block.name().lower()) == name:
-                return block_id
-        return None
+    def get_block_id_by_codepoint(self, code: int) -> typing.Optional[int]:
+        # works for any code, including codes outside of all blocks
+        block_id = self._codepoints.block[code]
+        return None if block_id == NONE else block_id
 
     def get_block_info(self, block_id: typing.Optional[int]) -> typing.Optional[BlockInfo]:
         if block_id is None or block_id not in self._blocks:
@@ -77,358 +124,260 @@ class UInfo:
         return self._blocks[block_id].info
 
     def get_block_infos(self) -> typing.List[BlockInfo]:
-        infos = []
-        last_block_id = -1
-        for codepoint in self._codepoints:
-            if not codepoint:
-                continue
-            if codepoint.block != last_block_id:
-                assert codepoint.block is not None
-                last_block_id = codepoint.block
-                block_info = self.get_block_info(last_block_id)
-                assert block_info
-                infos.append(block_info)
-        return infos
+        return self._block_infos
+
+    def get_assigned_codepoints(self) -> "array.array[int]":
+        return self._codepoints.assigned
+
+    def skeleton_table(self) -> SkeletonTable:
+        return self._skeletons
+
+    def codepoint_store(self) -> CodepointStore:
+        return self._codepoints
 
     def get_subblock(self, subblock_id: typing.Optional[int]) -> typing.Optional[Subblock]:
         if subblock_id is None or subblock_id not in self._subblocks:
             return None
         return self._subblocks[subblock_id]
 
-    def load(self, cache_dir: str) -> None:
+    def load(
+        self,
+        cache_dir: str,
+        workers: int = 0,
+        strings: typing.Optional[StringTable] = None,
+        pool: typing.Optional[PagePool] = None,
+        name_index: bool = True,
+    ) -> None:
+        # 'strings' and 'pool' are shared with the data of other Unicode versions; the name index is only
+        # needed for searching
         start_time = time.time()
+        if strings is not None:
+            self._codepoints = CodepointStore(0, strings)
+        self._data_version = download.data_version(cache_dir)
+        self._unihan = UnihanFields(os.path.join(cache_dir, "Unihan.zip"), DEFAULT_UNIHAN_FIELDS)
         self._load_blocks(os.path.join(cache_dir, "Blocks.txt"))
-        self._load_nameslist(os.path.join(cache_dir, "NamesList.txt"))
-        self._load_confusables(os.path.join(cache_dir, "confusables.txt"))
-        self._load_casefolding(os.path.join(cache_dir, "CaseFolding.txt"))
-        self._load_unihan(os.path.join(cache_dir, "Unihan_Readings.txt"))
-        self._load_hangul(os.path.join(cache_dir, "hangul.txt"))
-        self._load_wikipedia(os.path.join(cache_dir, "wikipedia.html"))
-        self._determine_prev_next_codepoints()
+        if workers > 1:
+            self._load_parallel(cache_dir, workers)
+        else:
+            self._load_nameslist(parsers.parse_nameslist(os.path.join(cache_dir, "NamesList.txt"), self._block_ends()))
+            self._load_confusables(parsers.parse_confusables(os.path.join(cache_dir, "confusables.txt")))
+            self._load_casefolding(parsers.parse_casefolding(os.path.join(cache_dir, "CaseFolding.txt")))
+            self._load_unihan(parsers.parse_unihan(os.path.join(cache_dir, "Unihan.zip")))
+            self._load_hangul(parsers.parse_hangul(os.path.join(cache_dir, "hangul.txt")))
+            self._load_wikipedia(parsers.parse_wikipedia(os.path.join(cache_dir, "wikipedia.html")))
         self._determine_prev_next_blocks()
+        self._codepoints.freeze(pool)
+        self._build_block_index()
+        if name_index:
+            self._build_name_index()
+        self.set_random_blocks(RANDOM_BLOCKS)
         elapsed_time = time.time() - start_time
         logging.info("loading time: %ds", elapsed_time)
 
+    def _load_parallel(self, cache_dir: str, workers: int) -> None:
+        # the files are parsed into plain records by a process pool; the records are merged in the same
+        # order as in a sequential load, so both modes produce the same data
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            nameslist = executor.submit(
+                parsers.parse_nameslist, os.path.join(cache_dir, "NamesList.txt"), self._block_ends()
+            )
+            confusables = executor.submit(parsers.parse_confusables, os.path.join(cache_dir, "confusables.txt"))
+            casefolding = executor.submit(parsers.parse_casefolding, os.path.join(cache_dir, "CaseFolding.txt"))
+            unihan = executor.submit(parsers.parse_unihan, os.path.join(cache_dir, "Unihan.zip"))
+            hangul = executor.submit(parsers.parse_hangul, os.path.join(cache_dir, "hangul.txt"))
+            wikipedia = executor.submit(parsers.parse_wikipedia, os.path.join(cache_dir, "wikipedia.html"))
+            self._load_nameslist(nameslist.result())
+            self._load_confusables(confusables.result())
+            self._load_casefolding(casefolding.result())
+            self._load_unihan(unihan.result())
+            self._load_hangul(hangul.result())
+            self._load_wikipedia(wikipedia.result())
+
+    def load_snapshot(self, file_name: str, source_fingerprint: bytes) -> bool:
+        start_time = time.time()
+        state = snapshot.read(file_name, source_fingerprint)
+        if state is None:
+            return False
+        self.__dict__.update(state)
+        elapsed_time = time.time() - start_time
+        logging.info("snapshot loading time: %.2fs", elapsed_time)
+        return True
+
+    def save_snapshot(self, file_name: str, source_fingerprint: bytes) -> None:
+        if len(self._codepoints) == 0:
+            raise RuntimeError("cannot save snapshot. chars not initialized, yet!")
+        snapshot.write(file_name, source_fingerprint, self.__dict__)
+
     def _load_blocks(self, file_name: str) -> None:
         if self._blocks:
             return
         self._blocks = {}
-        with open(file_name, "r", encoding="utf-8") as blocks_file:
-            for line in blocks_file:
-                line = line.strip()
-                if line.startswith("#") or line == "":
-                    continue
-                match = re.split(r"\.\.|;\s+", line)
-                if len(match) != 3:
-                    continue
-                range_from = hex2id(match[0])
-                assert range_from is not None
-                range_to = hex2id(match[1])
-                assert range_to is not None
-                name = match[2]
-                self._blocks[range_from] = Block(range_from, range_to, name)
-
-    def _load_nameslist(self, file_name: str) -> None:
-        if self._codepoints:
+        for range_from, range_to, name in parsers.parse_blocks(file_name):
+            self._blocks[range_from] = Block(range_from, range_to, name)
+
+    def _block_ends(self) -> typing.Dict[int, int]:
+        return {block_id: block.to_codepoint() for block_id, block in self._blocks.items()}
+
+    def _load_nameslist(self, records: parsers.NamesListRecords) -> None:
+        if len(self._codepoints) > 0:
             return
         self._initialize_codepoints()
-
+        codepoints = self._codepoints
+
+        for range_from, range_to, name in records.blocks:
+            self._blocks[range_from] = Block(range_from, range_to, name)
+            codepoints.add_block(range_from, range_from, range_to)
+        for codepoint_id, name in records.names:
+            assert codepoints.contains(codepoint_id)
+            codepoints.set_name(codepoint_id, name)
+        for codepoint_id, alternate in records.alternates:
+            codepoints.add_alternate(codepoint_id, alternate)
+        for codepoint_id, comment in records.comments:
+            codepoints.add_comment(codepoint_id, comment)
+        for codepoint_id, codepoint_id2 in records.related:
+            codepoints.related.append(codepoint_id, codepoint_id2)
         self._subblocks = {}
-        with open(file_name, encoding="utf-8") as nameslist_file:
-            codepoint_id: typing.Optional[int] = None
-            codepoint = None
-            subblock = None
-            blockend = None
-
-            re_x_name_hex = re.compile(r"^\tx \(.* - ([0-9A-F]{4,6})\)$")
-            re_x_hex = re.compile(r"^\tx ([0-9A-F]{4,6})$")
-            re_block_header = re.compile(r"^@@\t([0-9A-F]{4,6})\t(.*)\t([0-9A-F]{4,6})$")
-
-            for line in nameslist_file:
-                if re.match(r"^[0-9A-F]{4,6}\t", line):
-                    hex_name = line.split("\t")
-                    codepoint_id = hex2id(hex_name[0])
-                    if codepoint_id is None or codepoint_id > 0x10FFFF:
-                        raise ValueError(f"invalid code in line: {line}")
-                    codepoint = self.get_codepoint(codepoint_id)
-                    assert codepoint
-                    codepoint.set_name(hex_name[1].strip())
-                elif line.startswith("\t="):
-                    assert codepoint
-                    codepoint.alternate.append(line[2:].strip())
-                elif line.startswith("\t*"):
-                    assert codepoint
-                    codepoint.comments.append(line[2:].strip())
-                elif line.startswith("\tx"):
-                    match = re_x_name_hex.match(line)
-                    if match:
-                        codepoint_id2 = hex2id(match.group(1))
-                        if codepoint_id2 is None or codepoint_id2 > 0x10FFFF:
-                            raise ValueError(f"invalid code in line: {line}")
-                        assert codepoint
-                        codepoint.related.append(codepoint_id2)
-                        continue
-                    match = re_x_hex.match(line)
-                    if match:
-                        codepoint_id2 = hex2id(match.group(1))
-                        if codepoint_id2 is None or codepoint_id2 > 0x10FFFF:
-                            raise ValueError(f"invalid code in line: {line}")
-                        assert codepoint
-                        codepoint.related.append(codepoint_id2)
-                        continue
-                    logging.info("strange related: %s", line)
-                elif line.startswith("@@\t"):
-                    if subblock is not None:
-                        self._subblocks[subblock].set_to_codepoint(blockend)
-                    subblock = None
-                    match = re_block_header.match(line)
-                    if match is None:
-                        logging.info("bad block header: %s", line)
-                        continue
-                    block_id = hex2id(match.group(1))
-                    assert block_id is not None
-                    codepoint_id = block_id - 1
-                    if block_id in self._blocks:
-                        blockend = self._blocks[block_id].to_codepoint()
-                    else:
-                        range_from = block_id
-                        range_to = hex2id(match.group(3))
-                        assert range_to is not None
-                        blockend = range_to
-                        logging.info("unknown block: %s-%s: %s", match.group(1), match.group(3), match.group(2))
-                        self._blocks[block_id] = Block(range_from, range_to, match.group(2))
-
-                        for codepoint_id2 in range(range_from, range_to + 1):
-                            self._codepoints[codepoint_id2] = Codepoint(
-                                codepoint_id2, "<unassigned>", block_id=block_id
-                            )
-                elif line.startswith("@\t\t"):
-                    assert codepoint_id is not None
-                    if subblock is not None:
-                        self._subblocks[subblock].set_to_codepoint(codepoint_id)
-                    subblock = codepoint_id + 1
-                    self._subblocks[subblock] = Subblock(subblock, None, line[3:].strip())
-            if subblock is not None:
-                self._subblocks[subblock].set_to_codepoint(blockend)
+        for subblock_from, subblock_to, name in records.subblocks:
+            self._subblocks[subblock_from] = Subblock(subblock_from, subblock_to, name)
         self._assign_subblocks()
-        self._detect_codes_in_comments()
 
     def _initialize_codepoints(self) -> None:
         if not self._blocks:
             raise RuntimeError("blocks not initialized, yet!")
-        self._codepoints = [None] * (0x10FFFF + 1)
+        self._codepoints = CodepointStore(0x10FFFF + 1, self._codepoints.strings)
         for block_id, block in self._blocks.items():
-            for codepoint_id in block.codepoints_iter():
-                self._codepoints[codepoint_id] = Codepoint(codepoint_id, "<unassigned>", block_id=block_id)
+            self._codepoints.add_block(block_id, block.from_codepoint(), block.to_codepoint())
 
     def _assign_subblocks(self) -> None:
         for subblock_id, subblock in self._subblocks.items():
-            for codepoint_id in subblock.codepoints_iter():
-                codepoint = self.get_codepoint(codepoint_id)
-                assert codepoint
-                codepoint.subblock = subblock_id
-
-    def _detect_codes_in_comments(self) -> None:
-        re_hex = re.compile(r"\b[0-9A-F]{4,6}\b")
-        for codepoint in self._codepoints:
-            if codepoint is None:
-                continue
-            new_comments = []
-            for comment in codepoint.comments:
-                replacements = []
-                for hex_id in re_hex.findall(comment):
-                    if self.get_codepoint_info(hex2id(hex_id.lower())) is not None:
-                        replacements.append((hex_id, code_link(hex_id.lower())))
-                for replacement in replacements:
-                    comment = comment.replace(replacement[0], replacement[1])
-                new_comments.append(comment)
-            codepoint.comments = new_comments
-
-    def _load_confusables(self, file_name: str) -> None:
-        if not self._codepoints:
+            range_to = subblock.to_codepoint()
+            assert range_to is not None
+            assert self._codepoints.contains(subblock_id) and self._codepoints.contains(range_to)
+            self._codepoints.subblock.set(subblock_id, range_to, subblock_id)
+
+    def _load_confusables(self, records: parsers.ConfusablesRecords) -> None:
+        if len(self._codepoints) == 0:
             raise RuntimeError("cannot load confusables. chars not initialized, yet!")
-        with open(file_name, encoding="utf-8") as confusables_file:
-            hx = r"([0-9A-Fa-f]{4,6})"
-            re_confusable_pair = re.compile(r"^\s*" + hx + r"\s*;\s*" + hx + r"\s*;\s*MA")
-            re_confusable_list2 = re.compile(r"^\s*" + hx + r"\s*;\s*" + hx + r"\s+" + hx + r"\s*;\s*MA")
-            re_confusable_list3 = re.compile(r"^\s*" + hx + r"\s*;\s*" + hx + r"\s+" + hx + r"\s+" + hx + r"\s*;\s*MA")
-            re_confusable_list4 = re.compile(
-                r"^\s*" + hx + r"\s*;\s*" + hx + r"\s+" + hx + r"\s+" + hx + r"\s+" + hx + r"\s*;\s*MA"
-            )
-            sets: typing.Dict[int, typing.List[int]] = {}
-            for line in confusables_file:
-                line = line.strip()
-                if line.startswith("#") or line == "":
-                    continue
-                match = re_confusable_pair.match(line)
-                if match:
-                    codepoint_id1 = hex2id(match.group(1))
-                    codepoint_id2 = hex2id(match.group(2))
-                    assert codepoint_id1 is not None
-                    assert codepoint_id2 is not None
-                    if codepoint_id1 > codepoint_id2:
-                        codepoint_id1, codepoint_id2 = codepoint_id2, codepoint_id1
-                    if codepoint_id1 not in sets:
-                        sets[codepoint_id1] = []
-                        sets[codepoint_id1].append(codepoint_id1)
-                    sets[codepoint_id1].append(codepoint_id2)
-                    continue
-                for re_list in [
-                    re_confusable_list2,
-                    re_confusable_list3,
-                    re_confusable_list4,
-                ]:
-                    match = re_list.match(line)
-                    if match:
-                        codepoint = self.get_codepoint(hex2id(match.group(1)))
-                        assert codepoint
-                        codepoint.combinables.append(
-                            list(filter(None, [hex2id(group) for group in match.groups()[1:]]))
-                        )
-                        break
-            for _, confusable_set in sets.items():
-                for codepoint_id1 in confusable_set:
-                    confusables = []
-                    for codepoint_id2 in confusable_set:
-                        if codepoint_id2 != codepoint_id1:
-                            confusables.append(codepoint_id2)
-                    codepoint = self.get_codepoint(codepoint_id1)
-                    assert codepoint
-                    codepoint.confusables = confusables
-
-    def _load_casefolding(self, file_name: str) -> None:
-        if not self._codepoints:
+        self._skeletons = SkeletonTable(records.mappings)
+        for codepoint_id, sequence in records.sequences:
+            assert self._codepoints.contains(codepoint_id)
+            self._codepoints.add_combinable(codepoint_id, sequence)
+
+        # union-find over the confusable pairs; each connected component becomes one cluster
+        parent: typing.Dict[int, int] = {}
+
+        def find(code: int) -> int:
+            root = parent.setdefault(code, code)
+            while root != parent[root]:
+                parent[root] = parent[parent[root]]
+                root = parent[root]
+            return root
+
+        for codepoint_id1, codepoint_id2 in records.pairs:
+            root1, root2 = find(codepoint_id1), find(codepoint_id2)
+            if root1 != root2:
+                parent[max(root1, root2)] = min(root1, root2)
+        clusters: typing.Dict[int, typing.List[int]] = {}
+        for codepoint_id in sorted(parent):
+            assert self._codepoints.contains(codepoint_id)
+            clusters.setdefault(find(codepoint_id), []).append(codepoint_id)
+        for members in clusters.values():
+            if len(members) > 1:
+                self._codepoints.add_cluster(members)
+
+    def _load_casefolding(self, pairs: typing.List[parsers.CodePairRecord]) -> None:
+        if len(self._codepoints) == 0:
             raise RuntimeError("cannot load case folding. chars not initialized, yet!")
-        with open(file_name, encoding="utf-8") as casefolding_file:
-            re_case = re.compile(r"^\s*([0-9A-Fa-f]{4,6}); C; ([0-9A-Fa-f]{4,6}); #")
-            for line in casefolding_file:
-                line = line.strip()
-                if line.startswith("#") or line == "":
-                    continue
-                match = re_case.match(line)
-                if match:
-                    codepoint_id1 = hex2id(match.group(1))
-                    codepoint_id2 = hex2id(match.group(2))
-
-                    codepoint1 = self.get_codepoint(codepoint_id1)
-                    assert codepoint1
-                    codepoint1.case = codepoint_id2
-
-                    codepoint2 = self.get_codepoint(codepoint_id2)
-                    assert codepoint2
-                    codepoint2.case = codepoint_id1
-
-    def _load_unihan(self, file_name: str) -> None:
-        if not self._codepoints:
+        for codepoint_id1, codepoint_id2 in pairs:
+            assert self._codepoints.contains(codepoint_id1)
+            assert self._codepoints.contains(codepoint_id2)
+            self._codepoints.case[codepoint_id1] = codepoint_id2
+            self._codepoints.case[codepoint_id2] = codepoint_id1
+
+    def _load_unihan(self, definitions: typing.List[parsers.CodeNameRecord]) -> None:
+        if len(self._codepoints) == 0:
             raise RuntimeError("cannot load unihan. chars not initialized, yet!")
-        with open(file_name, "r", encoding="utf-8") as unihan_file:
-            re_definition = re.compile(r"^U\+([0-9A-Fa-f]{4,6})\tkDefinition\t(.*)$")
-            for line in unihan_file:
-                line = line.strip()
-                match = re_definition.match(line)
-                if match:
-                    codepoint_id = hex2id(match.group(1))
-                    assert codepoint_id is not None
-                    if codepoint_id >= len(self._codepoints):
-                        continue
-                    codepoint = self.get_codepoint(codepoint_id)
-                    assert codepoint is not None
-                    codepoint.set_name(match.group(2))
-
-    def _load_wikipedia(self, file_name: str) -> None:
-        if not self._codepoints:
+        for codepoint_id, definition in definitions:
+            if codepoint_id >= len(self._codepoints):
+                continue
+            assert self._codepoints.contains(codepoint_id)
+            self._codepoints.set_name(codepoint_id, definition)
+
+    def _load_wikipedia(self, urls: typing.List[parsers.CodeNameRecord]) -> None:
+        if len(self._codepoints) == 0:
             raise RuntimeError("cannot load wikipedia. chars not initialized, yet!")
-        with open(file_name, encoding="utf-8") as wikipedia_file:
-            rx1 = re.compile(r'^<td data-sort-value=".*">U\+([0-9A-Fa-f]{4,6})\.\.U\+([0-9A-Fa-f]{4,6})</td>')
-            rx2 = re.compile(r'^<td><a href="([^"]*)".*title="([^"]*)">')
-            range_from = None
-            for line in wikipedia_file:
-                line = line.strip()
-                if range_from is None:
-                    match = rx1.match(line)
-                    if match:
-                        range_from = hex2id(match.group(1))
-                else:
-                    match = rx2.match(line)
-                    if match:
-                        url = match.group(1)
-                        block = self.get_block(range_from)
-                        if block:
-                            block.wikipedia = f"https://en.wikipedia.org{url}"
-                            block.wikipedia_summary = None
-                    range_from = None
-
-    def _load_hangul(self, file_name: str) -> None:
-        if not self._codepoints:
+        for range_from, url in urls:
+            block = self._blocks.get(range_from)
+            if block:
+                block.wikipedia = url
+
+    def _load_hangul(self, names: typing.List[parsers.CodeNameRecord]) -> None:
+        if len(self._codepoints) == 0:
             raise RuntimeError("cannot load hangul. chars not initialized, yet!")
-        with open(file_name, "r", encoding="utf-8") as hangul_file:
-            #   423	0xAE28	긨 (HANGUL SYLLABLE GYISS)
-            re_definition = re.compile(r"^\s*[0-9]+\s*0x([0-9A-Fa-f]{4,6})\s+.*\((.+)\)\s*$")
-            for line in hangul_file:
-                line = line.strip()
-                match = re_definition.match(line)
-                if match is None:
-                    continue
-                codepoint_id = hex2id(match.group(1))
-                assert codepoint_id is not None
-                if codepoint_id >= len(self._codepoints):
-                    continue
-                name = match.group(2)
-                codepoint = self.get_codepoint(codepoint_id)
-                assert codepoint is not None
-                if codepoint.name() == "<unassigned>":
-                    codepoint.set_name(name)
-
-    def _determine_prev_next_codepoints(self) -> None:
-        last: typing.Optional[Codepoint] = None
-        for i, codepoint in enumerate(self._codepoints):
-            if codepoint is None:
+        for codepoint_id, name in names:
+            if codepoint_id >= len(self._codepoints):
                 continue
-            if last is not None:
-                last.next = i
-                codepoint.prev = last.codepoint_id()
-            else:
-                codepoint.prev = None
-            codepoint.next = None
-            last = codepoint
+            assert self._codepoints.contains(codepoint_id)
+            if self._codepoints.name(codepoint_id) == UNASSIGNED:
+                self._codepoints.set_name(codepoint_id, name)
 
     def _determine_prev_next_blocks(self) -> None:
         last_block_id = None
-        for codepoint in self._codepoints:
-            if codepoint is None:
-                continue
-            block_id = codepoint.block
-            assert block_id is not None
+        for block_id in sorted(self._blocks):
+            if last_block_id is not None:
+                self._blocks[last_block_id].next = block_id
+            self._blocks[block_id].prev = last_block_id
+            self._blocks[block_id].next = None
+            last_block_id = block_id
+
+    def _build_block_index(self) -> None:
+        # the blocks in codepoint order (as they appear in the block ranges)
+        self._block_infos = []
+        last_block_id = NONE
+        for _, _, block_id in self._codepoints.block.ranges():
             if block_id != last_block_id:
-                if last_block_id is not None:
-                    self._blocks[last_block_id].next = block_id
-                self._blocks[block_id].prev = last_block_id
-                self._blocks[block_id].next = None
+                self._block_infos.append(self._blocks[block_id].info)
                 last_block_id = block_id
+        self._block_ids_by_name = {}
+        for block_id, block in self._blocks.items():
+            self._block_ids_by_name.setdefault(normalize_block_name(block.name()), block_id)
+
+    def _build_name_index(self) -> None:
+        start_time = time.time()
+        codepoints = self._codepoints
+        upper_names: typing.Dict[int, str] = {}
+        entries: typing.List[typing.Tuple[int, str]] = []
+        entries_deprioritized: typing.List[typing.Tuple[int, str]] = []
+        for range_from, range_to, block_id in codepoints.block.ranges():
+            block_entries = entries_deprioritized if block_id in DEPRIORITIZED_BLOCKS else entries
+            for codepoint_id, name_index in zip(
+                range(range_from, range_to + 1), codepoints.name_indexes(range_from, range_to)
+            ):
+                upper_name = upper_names.get(name_index)
+                if upper_name is None:
+                    upper_name = codepoints.strings.get(name_index).upper()
+                    upper_names[name_index] = upper_name
+                block_entries.append((codepoint_id, upper_name))
+        self._name_index = NameIndex(entries)
+        self._name_index_deprioritized = NameIndex(entries_deprioritized)
+        elapsed_time = time.time() - start_time
+        logging.info(
+            "name index: %d words, %d postings, %d trigrams, %.1f MiB, built in %.2fs",
+            self._name_index.word_count() + self._name_index_deprioritized.word_count(),
+            self._name_index.posting_count() + self._name_index_deprioritized.posting_count(),
+            self._name_index.trigram_count() + self._name_index_deprioritized.trigram_count(),
+            (self._name_index.size_bytes() + self._name_index_deprioritized.size_bytes()) / 2**20,
+            elapsed_time,
+        )
 
     def search_by_name(
         self, keyword: str, limit: int
     ) -> typing.Tuple[typing.List[CodepointInfo], typing.Optional[str]]:
-        matches, message = self.search_direct(keyword)
+        matches, message = self._search_direct(keyword)
         if len(matches) > 0:
             return matches, message
 
         matches_prio: typing.List[typing.Tuple[CodepointInfo, int]] = []
-        # CJK blocks are deprioritized, since their characters have very long descriptive names
-        deprioritized_blocks = [
-            0x2E80,
-            0x2F00,
-            0x31C0,
-            0x3300,
-            0x3400,
-            0x4E00,
-            0xF900,
-            0x20000,
-            0x2A700,
-            0x2B740,
-            0x2B820,
-            0x2F800,
-        ]
         limit_reached = False
 
         keywords: typing.List[str] = []
@@ -437,34 +386,23 @@ class UInfo:
             if word != "":
                 keywords.append(word)
 
-        # search in non-deprioritized blocks first
-        for codepoint in self._codepoints:
-            if codepoint is None or codepoint.block in deprioritized_blocks:
-                continue
-            if all_in(keywords, codepoint.name().upper()):
-                if len(matches_prio) >= limit:
-                    limit_reached = True
-                    break
-                matches_prio.append((codepoint.info, len(codepoint.name())))
-                continue
-
-        # search in deprioritized blocks
-        for codepoint in self._codepoints:
-            if codepoint is None or codepoint.block not in deprioritized_blocks:
-                continue
-            if all_in(keywords, codepoint.name().upper()):
+        # search in non-deprioritized blocks first, then in deprioritized blocks
+        for name_index, factor in [(self._name_index, 1), (self._name_index_deprioritized, 10)]:
+            for codepoint_id in name_index.search(keywords, limit + 1 - len(matches_prio)):
                 if len(matches_prio) >= limit:
                     limit_reached = True
                     break
-                matches_prio.append((codepoint.info, 10 * len(codepoint.name())))
-                continue
+                name = self._codepoints.name(codepoint_id)
+                matches_prio.append((CodepointInfo(self._codepoints, codepoint_id), factor * len(name)))
+            if limit_reached:
+                break
 
         return (
             list(map(lambda x: x[0], sorted(matches_prio, key=lambda x: x[1]))),
             f"Search aborted after {limit} matches" if limit_reached else None,
         )
 
-    def search_direct(self, keyword: str) -> typing.Tuple[typing.List[CodepointInfo], typing.Optional[str]]:
+    def _search_direct(self, keyword: str) -> typing.Tuple[typing.List[CodepointInfo], typing.Optional[str]]:
         if len(keyword) == 1:
             result = self.get_codepoint_info(ord(keyword))
             assert result
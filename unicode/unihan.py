@@ -0,0 +1,109 @@
+import array
+import bisect
+import logging
+import threading
+import time
+import typing
+
+from unicode.parsers import UNIHAN_READINGS_MEMBER, open_zip_member
+from unicode.store import StringTable
+
+UNIHAN_IRG_SOURCES_MEMBER = "Unihan_IRGSources.txt"
+
+# Unihan field -> (zip member containing it, label shown on codepoint pages)
+UNIHAN_FIELDS = {
+    "kCantonese": (UNIHAN_READINGS_MEMBER, "Cantonese"),
+    "kHangul": (UNIHAN_READINGS_MEMBER, "Hangul"),
+    "kHanyuPinyin": (UNIHAN_READINGS_MEMBER, "Hanyu Pinyin"),
+    "kJapaneseKun": (UNIHAN_READINGS_MEMBER, "Japanese Kun"),
+    "kJapaneseOn": (UNIHAN_READINGS_MEMBER, "Japanese On"),
+    "kKorean": (UNIHAN_READINGS_MEMBER, "Korean"),
+    "kMandarin": (UNIHAN_READINGS_MEMBER, "Mandarin"),
+    "kVietnamese": (UNIHAN_READINGS_MEMBER, "Vietnamese"),
+    "kRSUnicode": (UNIHAN_IRG_SOURCES_MEMBER, "Radical-Stroke"),
+    "kTotalStrokes": (UNIHAN_IRG_SOURCES_MEMBER, "Total Strokes"),
+}
+DEFAULT_UNIHAN_FIELDS = ["kMandarin", "kCantonese", "kJapaneseOn", "kJapaneseKun", "kRSUnicode", "kTotalStrokes"]
+
+
+class FieldTable:
+    # sorted codepoints with the indexes of their (deduplicated) values
+    def __init__(self) -> None:
+        self.codes: "array.array[int]" = array.array("i")
+        self.values: "array.array[int]" = array.array("i")
+        self.strings = StringTable()
+
+    def add(self, code: int, value: str) -> None:
+        self.codes.append(code)
+        self.values.append(self.strings.add(value))
+
+    def get(self, code: int) -> typing.Optional[str]:
+        index = bisect.bisect_left(self.codes, code)
+        if index == len(self.codes) or self.codes[index] != code:
+            return None
+        return self.strings.get(self.values[index])
+
+    def freeze(self) -> None:
+        if any(self.codes[i] > self.codes[i + 1] for i in range(len(self.codes) - 1)):
+            order = sorted(range(len(self.codes)), key=lambda i: self.codes[i])
+            self.codes = array.array("i", [self.codes[i] for i in order])
+            self.values = array.array("i", [self.values[i] for i in order])
+        self.strings.freeze()
+
+
+class UnihanFields:
+    # additional Unihan fields; they are read from the zip file when a CJK page first asks for them
+    def __init__(self, zip_file_name: str, fields: typing.Iterable[str]) -> None:
+        self._zip_file_name = zip_file_name
+        self._fields = [field for field in fields if field in UNIHAN_FIELDS]
+        for field in fields:
+            if field not in UNIHAN_FIELDS:
+                logging.warning("unsupported unihan field: %s", field)
+        self._tables: typing.Optional[typing.Dict[str, FieldTable]] = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> typing.Dict[str, typing.Any]:
+        # the tables are loaded lazily, so they are not part of a snapshot
+        return {"_zip_file_name": self._zip_file_name, "_fields": self._fields}
+
+    def __setstate__(self, state: typing.Dict[str, typing.Any]) -> None:
+        self.__dict__.update(state)
+        self._tables = None
+        self._lock = threading.Lock()
+
+    def zip_file_name(self) -> str:
+        return self._zip_file_name
+
+    def get(self, code: int) -> typing.List[typing.Tuple[str, str]]:
+        tables = self._tables
+        if tables is None:
+            tables = self._load()
+        result = []
+        for field in self._fields:
+            value = tables[field].get(code)
+            if value is not None:
+                result.append((UNIHAN_FIELDS[field][1], value))
+        return result
+
+    def _load(self) -> typing.Dict[str, FieldTable]:
+        with self._lock:
+            if self._tables is not None:
+                return self._tables
+            start_time = time.time()
+            tables = {field: FieldTable() for field in self._fields}
+            for member in sorted({UNIHAN_FIELDS[field][0] for field in self._fields}):
+                try:
+                    for line in open_zip_member(self._zip_file_name, member):
+                        if not line.startswith("U+"):
+                            continue
+                        code, field, value = line.rstrip("\n").split("\t", 2)
+                        if field in tables:
+                            tables[field].add(int(code[2:], 16), value)
+                except (OSError, KeyError) as error:
+                    logging.warning("failed to read unihan member %s: %s", member, error)
+            for table in tables.values():
+                table.freeze()
+            self._tables = tables
+            elapsed_time = time.time() - start_time
+            logging.info("unihan fields loading time: %.2fs", elapsed_time)
+            return tables
@@ -0,0 +1,92 @@
+import typing
+
+from flask import redirect, render_template, url_for
+from werkzeug.wrappers import Response
+
+from unicode import app
+from unicode.codepoint import hex2id
+
+
+@app.flask_app.route("/v/<version>/c/<char_code>")
+def show_version_code(version: str, char_code: str) -> typing.Union[app.StrIntT, Response]:
+    if not app.use_version(version):
+        return render_template("404.html"), 404
+    return app.show_code(char_code)
+
+
+@app.flask_app.route("/v/<version>/b/<block_code>")
+def show_version_block(version: str, block_code: str) -> typing.Union[app.StrIntT, Response]:
+    if not app.use_version(version):
+        return render_template("404.html"), 404
+    return app.show_block_page(block_code, 1)
+
+
+@app.flask_app.route("/v/<version>/b/<block_code>/<int:page>")
+def show_version_block_paged(version: str, block_code: str, page: int) -> typing.Union[app.StrIntT, Response]:
+    if not app.use_version(version):
+        return render_template("404.html"), 404
+    if page == 1:
+        return redirect(url_for("show_version_block", version=version, block_code=block_code))
+    return app.show_block_page(block_code, page)
+
+
+@app.flask_app.route("/v/<version>/b/<block_code>/all")
+def show_version_block_all(version: str, block_code: str) -> typing.Union[app.StrIntT, Response]:
+    if not app.use_version(version):
+        return render_template("404.html"), 404
+    return app.show_block_all(block_code)
+
+
+@app.flask_app.route("/v/<version>/diff")
+def show_version_diff(version: str) -> typing.Union[app.StrIntT, Response]:
+    # the blocks with codepoints that were added, removed or renamed since the previous version
+    versions = app.current_versions()
+    previous = versions.previous(version)
+    if not app.use_version(version) or previous is None:
+        return render_template("404.html"), 404
+    uinfo = app.current_unicode_info()
+    previous_info = versions.get(previous)
+    assert previous_info is not None
+    blocks = []
+    for block_id, block_diff in sorted(versions.diff(version).items()):
+        block = uinfo.get_block(block_id) or previous_info.get_block(block_id)
+        assert block is not None
+        blocks.append((block, len(block_diff.added), len(block_diff.removed), len(block_diff.renamed)))
+    data = {"version": version, "previous": previous, "blocks": blocks, "block": None}
+    etag = app.page_etag("D", 0, f"-{previous_info.data_version()}")
+    return app.conditional_response(
+        etag,
+        lambda: app.render_cache.get_or_render(
+            uinfo.data_version(), etag, lambda: render_template("diff.html", data=data)
+        ),
+    )
+
+
+@app.flask_app.route("/v/<version>/diff/<block_code>")
+def show_version_block_diff(version: str, block_code: str) -> typing.Union[app.StrIntT, Response]:
+    versions = app.current_versions()
+    previous = versions.previous(version)
+    block_id = hex2id(block_code.lower())
+    if not app.use_version(version) or previous is None or block_id not in versions.diff(version):
+        return render_template("404.html"), 404
+    uinfo = app.current_unicode_info()
+    previous_info = versions.get(previous)
+    assert previous_info is not None and block_id is not None
+    block_diff = versions.diff(version)[block_id]
+    data = {
+        "version": version,
+        "previous": previous,
+        "block": uinfo.get_block(block_id) or previous_info.get_block(block_id),
+        "added": list(filter(None, map(uinfo.get_codepoint_info, block_diff.added))),
+        "removed": list(filter(None, map(previous_info.get_codepoint_info, block_diff.removed))),
+        "renamed": [
+            (previous_info.get_codepoint_info(code), uinfo.get_codepoint_info(code)) for code in block_diff.renamed
+        ],
+    }
+    etag = app.page_etag("d", block_id, f"-{previous_info.data_version()}")
+    return app.conditional_response(
+        etag,
+        lambda: app.render_cache.get_or_render(
+            uinfo.data_version(), etag, lambda: render_template("diff.html", data=data)
+        ),
+    )
@@ -0,0 +1,110 @@
+import array
+import logging
+import os
+import typing
+
+from unicode.store import UNASSIGNED, PagePool
+from unicode.uinfo import UInfo
+
+
+class BlockDiff(typing.NamedTuple):
+    # codepoints of a block that were added, removed or renamed between two Unicode versions
+    added: "array.array[int]"
+    removed: "array.array[int]"
+    renamed: "array.array[int]"
+
+
+def version_key(version: str) -> typing.Tuple[int, ...]:
+    return tuple(int(part) for part in version.split(".") if part.isdigit())
+
+
+def version_dir(cache_dir: str, version: str) -> str:
+    # the data files of an additional Unicode version
+    return os.path.join(cache_dir, version)
+
+
+class VersionSet:
+    # The served Unicode versions: the primary one (served at /c/..., /b/...) and additional ones (served at
+    # /v/<version>/...), with the changes of each version relative to the previous one.
+    def __init__(self, primary_version: str, infos: typing.Dict[str, UInfo]) -> None:
+        self._primary_version = primary_version
+        self._infos = infos
+        self._versions = sorted(infos, key=version_key)
+        self._diffs: typing.Dict[str, typing.Dict[int, BlockDiff]] = {}
+        for previous, version in zip(self._versions, self._versions[1:]):
+            self._diffs[version] = diff(infos[version], infos[previous])
+
+    def primary_version(self) -> str:
+        return self._primary_version
+
+    def primary(self) -> UInfo:
+        return self._infos[self._primary_version]
+
+    def versions(self) -> typing.List[str]:
+        return self._versions
+
+    def get(self, version: str) -> typing.Optional[UInfo]:
+        return self._infos.get(version)
+
+    def previous(self, version: str) -> typing.Optional[str]:
+        if version not in self._infos:
+            return None
+        index = self._versions.index(version)
+        return self._versions[index - 1] if index > 0 else None
+
+    def diff(self, version: str) -> typing.Dict[int, BlockDiff]:
+        return self._diffs.get(version, {})
+
+    def data_versions(self) -> typing.List[str]:
+        return [info.data_version() for info in self._infos.values()]
+
+
+def load_versions(
+    primary: UInfo, primary_version: str, cache_dir: str, versions: typing.Iterable[str], workers: int = 0
+) -> VersionSet:
+    # The additional versions share the string table and the identical column/relation pages with the
+    # primary one (and with each other), so names, comments and relations that did not change between
+    # versions are stored once. They are loaded from the data files, since snapshots cannot share. Searches
+    # only use the primary version, so the others have no name index.
+    pool = PagePool()
+    for page in primary.codepoint_store().pages():
+        pool.intern(page)
+    infos = {primary_version: primary}
+    for version in versions:
+        if version in infos:
+            continue
+        info = UInfo()
+        info.load(version_dir(cache_dir, version), workers, primary.codepoint_store().strings, pool, name_index=False)
+        set_url_prefix(info, f"/v/{version}")
+        infos[version] = info
+    logging.info("unicode versions: %s, %d shared pages", ", ".join(sorted(infos, key=version_key)), len(pool))
+    return VersionSet(primary_version, infos)
+
+
+def set_url_prefix(uinfo: UInfo, url_prefix: str) -> None:
+    uinfo.codepoint_store().url_prefix = url_prefix
+    for block_info in uinfo.get_block_infos():
+        block_info.url_prefix = url_prefix
+
+
+def diff(new: UInfo, old: UInfo) -> typing.Dict[int, BlockDiff]:
+    # the codepoints that were added, removed or renamed since 'old', by block (of the version that has the
+    # codepoint)
+    new_store = new.codepoint_store()
+    old_store = old.codepoint_store()
+    changes: typing.Dict[int, typing.Tuple[typing.List[int], typing.List[int], typing.List[int]]] = {}
+    for code in new_store.changed_names(old_store):
+        new_name = new_store.name(code)
+        old_name = old_store.name(code)
+        if new_name == UNASSIGNED:
+            block_id = old.get_block_id_by_codepoint(code)
+            kind = 1
+        else:
+            block_id = new.get_block_id_by_codepoint(code)
+            kind = 0 if old_name == UNASSIGNED else 2
+        if block_id is not None:
+            changes.setdefault(block_id, ([], [], []))[kind].append(code)
+    return {
+        block_id: BlockDiff(*(array.array("i", codes) for codes in block_changes))
+        for block_id, block_changes in changes.items()
+    }